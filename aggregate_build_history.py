@@ -1,9 +1,45 @@
 # aggregate_build_history.py
 import json
-from datetime import datetime
-from typing import Dict, List
+import math
+import re
+import sys
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional
+from time_format import format_ms
 from ui_components import display_table, confirm_action
 
+# fromisoformat() only accepts the trailing 'Z' natively from Python 3.11
+_NATIVE_ISO_Z = sys.version_info >= (3, 11)
+
+# Build history is fetched in pages of HISTORY_PAGE_SIZE, up to MAX_HISTORY_BATCHES batches
+HISTORY_PAGE_SIZE = 20
+MAX_HISTORY_BATCHES = 100
+
+_ISO_DURATION_RE = re.compile(r'^PT(?:(\d+(?:\.\d+)?)H)?(?:(\d+(?:\.\d+)?)M)?(?:(\d+(?:\.\d+)?)S)?$')
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso(ts: str) -> datetime:
+    """Parse an ISO timestamp, memoized since each batch time is read several times"""
+    if _NATIVE_ISO_Z:
+        return datetime.fromisoformat(ts)
+    return datetime.fromisoformat(ts.replace('Z', '+00:00'))
+
+
+def _try_parse_iso(ts: str) -> Optional[datetime]:
+    """Parse an ISO timestamp, or return None if it is missing or malformed
+
+    Obviously non-timestamp values are rejected before reaching fromisoformat,
+    so the common bad-data cases never raise.
+    """
+    if not ts or len(ts) < 16 or 'T' not in ts:
+        return None
+    try:
+        return _parse_iso(ts)
+    except (ValueError, TypeError):
+        return None
+
 
 class AggregateBuildHistory:
     def __init__(self, api_client):
@@ -13,10 +49,11 @@ class AggregateBuildHistory:
         """Show aggregate build history for a specific cube"""
         try:
             print("\nFetching build history...")
-            response = self.api_client.get_aggregate_build_history(
+            response = self.api_client.get_aggregate_build_history_all_pages(
                 cube_data["project_id"], 
                 cube_data["cube_id"],
-                limit=20
+                limit=HISTORY_PAGE_SIZE,
+                max_records=MAX_HISTORY_BATCHES
             )
             
             history_data = response.get("response", {}).get("data", [])
@@ -33,13 +70,13 @@ class AggregateBuildHistory:
             columns = ["Batch ID", "Start Time", "End Time", "Duration", "Status", "Type", "Estimate", "Total Build"]
             display_data = []
             
-            for batch in history_data:
+            # Durations are computed once and shared by the table, summary and detail views
+            durations_ms = [self._batch_duration_ms(batch) for batch in history_data]
+            
+            for batch, duration_ms in zip(history_data, durations_ms):
                 batch_id = batch.get("id", "N/A")
-                
-                # Calculate duration
                 start_time = batch.get("startTime", "")
                 end_time = batch.get("endTime", "")
-                duration = self._calculate_duration(start_time, end_time)
                 
                 # Parse times
                 start_display = self._format_time_display(start_time)
@@ -47,89 +84,83 @@ class AggregateBuildHistory:
                 
                 # Format estimate time
                 estimate = batch.get("estimateTime", 0)
-                estimate_str = f"{estimate}ms"
-                if estimate > 1000:
-                    estimate_str = f"{estimate/1000:.1f}s"
+                estimate_str = f"{estimate/1000:.1f}s" if estimate > 1000 else f"{estimate}ms"
                 
                 # Format total build time (PT3.232S format)
-                total_build = batch.get("sumOfInstanceBuildTimes", "PT0S")
-                total_build_str = self._parse_iso_duration(total_build)
+                total_build_str = self._parse_iso_duration(batch.get("sumOfInstanceBuildTimes", "PT0S"))
                 
-                display_data.append({
-                    "Batch ID": batch_id[:12] + "...",
-                    "Start Time": start_display,
-                    "End Time": end_display,
-                    "Duration": duration,
-                    "Status": batch.get("status", "unknown"),
-                    "Type": "Full" if batch.get("isFullBuild") else "Incremental",
-                    "Estimate": estimate_str,
-                    "Total Build": total_build_str
-                })
+                # Row tuple in column order
+                display_data.append((
+                    batch_id[:12] + "...",
+                    start_display,
+                    end_display,
+                    self._format_duration(duration_ms),
+                    batch.get("status", "unknown"),
+                    "Full" if batch.get("isFullBuild") else "Incremental",
+                    estimate_str,
+                    total_build_str
+                ))
             
             display_table(display_data, columns)
             
             # Show summary statistics
-            self._show_build_history_summary(history_data)
+            self._show_build_history_summary(history_data, durations_ms)
             
             # Option to show detailed view
             if confirm_action("\nShow detailed batch information?"):
-                self._show_detailed_batch_info(history_data)
+                self._show_detailed_batch_info(history_data, durations_ms)
                 
         except Exception as e:
             print(f"Error: {e}")
     
-    def _calculate_duration(self, start_time: str, end_time: str) -> str:
-        """Calculate duration between two ISO timestamps"""
-        if not start_time or not end_time:
-            return "N/A"
+    def _batch_duration_ms(self, batch: Dict) -> Optional[float]:
+        """Calculate batch duration in milliseconds, or None if either timestamp is missing/invalid"""
+        start_time = batch.get("startTime", "")
+        end_time = batch.get("endTime", "")
+        start_dt = _try_parse_iso(start_time)
+        end_dt = _try_parse_iso(end_time)
+        if start_dt is None or end_dt is None:
+            return None
         
         try:
-            start = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-            end = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
-            duration_ms = (end - start).total_seconds() * 1000
-            return self._format_time(duration_ms)
-        except:
-            return "N/A"
+            return (end_dt - start_dt).total_seconds() * 1000
+        except TypeError:
+            # Naive and timezone-aware timestamps can't be compared
+            return None
+    
+    def _format_duration(self, duration_ms: Optional[float]) -> str:
+        """Format a precomputed batch duration for display"""
+        return "N/A" if duration_ms is None else format_ms(duration_ms)
     
     def _format_time_display(self, time_str: str) -> str:
         """Format time for display"""
         if not time_str:
             return "N/A"
         
-        try:
-            dt = datetime.fromisoformat(time_str.replace('Z', '+00:00'))
-            return dt.strftime("%m/%d %H:%M")
-        except:
+        dt = _try_parse_iso(time_str)
+        if dt is None:
             return time_str[:16]
+        return dt.strftime("%m/%d %H:%M")
     
     def _parse_iso_duration(self, duration_str: str) -> str:
-        """Parse ISO 8601 duration string (e.g., PT3.232S)"""
-        if not duration_str or not duration_str.startswith("PT"):
+        """Parse ISO 8601 duration string (e.g., PT3.232S, PT1H30M)"""
+        if not duration_str:
             return "N/A"
         
-        try:
-            # Remove PT prefix
-            duration = duration_str[2:]
-            
-            if duration.endswith("S"):
-                seconds = float(duration[:-1])
-                if seconds < 60:
-                    return f"{seconds:.1f}s"
-                else:
-                    minutes = seconds / 60
-                    return f"{minutes:.1f}min"
-            elif duration.endswith("M"):
-                minutes = float(duration[:-1])
-                return f"{minutes:.1f}min"
-            elif duration.endswith("H"):
-                hours = float(duration[:-1])
-                return f"{hours:.1f}hr"
-            else:
-                return duration_str
-        except:
-            return duration_str
+        match = _ISO_DURATION_RE.match(duration_str)
+        if not match:
+            return duration_str if duration_str.startswith("PT") else "N/A"
+        
+        hours, minutes, seconds = match.groups()
+        total = float(hours or 0) * 3600 + float(minutes or 0) * 60 + float(seconds or 0)
+        if total < 60:
+            return f"{total:.1f}s"
+        elif total < 3600:
+            return f"{total / 60:.1f}min"
+        else:
+            return f"{total / 3600:.1f}hr"
     
-    def _show_build_history_summary(self, history_data: List[Dict]) -> None:
+    def _show_build_history_summary(self, history_data: List[Dict], durations_ms: List[Optional[float]]) -> None:
         """Show summary statistics for build history"""
         print(f"\n{'='*50}")
         print("BUILD HISTORY SUMMARY")
@@ -140,68 +171,76 @@ class AggregateBuildHistory:
             return
         
         total_batches = len(history_data)
-        successful = sum(1 for b in history_data if b.get("status") == "done")
-        failed = sum(1 for b in history_data if b.get("status") == "failed")
-        running = sum(1 for b in history_data if b.get("status") == "running")
-        full_builds = sum(1 for b in history_data if b.get("isFullBuild"))
+        successful = failed = running = full_builds = 0
         
-        # Calculate average duration
-        durations = []
-        for batch in history_data:
-            start_time = batch.get("startTime", "")
-            end_time = batch.get("endTime", "")
-            if start_time and end_time:
-                try:
-                    start = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-                    end = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
-                    duration_ms = (end - start).total_seconds() * 1000
-                    durations.append(duration_ms)
-                except:
-                    pass
+        # Count statuses and accumulate durations in a single pass
+        duration_sum = 0.0
+        duration_count = 0
+        min_duration = math.inf
+        max_duration = -math.inf
+        for batch, duration_ms in zip(history_data, durations_ms):
+            status = batch.get("status")
+            if status == "done":
+                successful += 1
+            elif status == "failed":
+                failed += 1
+            elif status == "running":
+                running += 1
+            if batch.get("isFullBuild"):
+                full_builds += 1
+            
+            if duration_ms is not None:
+                duration_sum += duration_ms
+                duration_count += 1
+                if duration_ms < min_duration:
+                    min_duration = duration_ms
+                if duration_ms > max_duration:
+                    max_duration = duration_ms
         
-        avg_duration = sum(durations) / len(durations) if durations else 0
+        avg_duration = duration_sum / duration_count if duration_count else 0
         
-        print(f"\nBatch Statistics:")
-        print(f"  Total Batches:      {total_batches}")
-        print(f"  Successful:         {successful} ({successful/total_batches*100:.1f}%)")
-        print(f"  Failed:             {failed} ({failed/total_batches*100:.1f}%)")
-        print(f"  Running:            {running} ({running/total_batches*100:.1f}%)")
-        print(f"  Full Builds:        {full_builds} ({full_builds/total_batches*100:.1f}%)")
+        lines = []
+        lines.append(f"\nBatch Statistics:")
+        lines.append(f"  Total Batches:      {total_batches}")
+        lines.append(f"  Successful:         {successful} ({successful/total_batches*100:.1f}%)")
+        lines.append(f"  Failed:             {failed} ({failed/total_batches*100:.1f}%)")
+        lines.append(f"  Running:            {running} ({running/total_batches*100:.1f}%)")
+        lines.append(f"  Full Builds:        {full_builds} ({full_builds/total_batches*100:.1f}%)")
         
-        if durations:
-            print(f"\nDuration Statistics:")
-            print(f"  Average Duration:   {self._format_time(avg_duration)}")
-            if len(durations) > 1:
-                min_duration = min(durations)
-                max_duration = max(durations)
-                print(f"  Minimum Duration:   {self._format_time(min_duration)}")
-                print(f"  Maximum Duration:   {self._format_time(max_duration)}")
+        if duration_count:
+            lines.append(f"\nDuration Statistics:")
+            lines.append(f"  Average Duration:   {format_ms(avg_duration)}")
+            if duration_count > 1:
+                lines.append(f"  Minimum Duration:   {format_ms(min_duration)}")
+                lines.append(f"  Maximum Duration:   {format_ms(max_duration)}")
         
         # Show recent builds timeline
-        print(f"\nRecent Build Timeline:")
-        recent_builds = history_data[:5]  # Last 5 builds
-        for i, batch in enumerate(recent_builds, 1):
+        lines.append(f"\nRecent Build Timeline:")
+        recent_builds = zip(history_data[:5], durations_ms)  # Last 5 builds
+        for i, (batch, duration_ms) in enumerate(recent_builds, 1):
             status = batch.get("status", "unknown")
             batch_type = "Full" if batch.get("isFullBuild") else "Incremental"
             batch_id = batch.get("id", "N/A")[:8] + "..."
+            duration = self._format_duration(duration_ms)
             
-            # Get duration
-            start_time = batch.get("startTime", "")
-            end_time = batch.get("endTime", "")
-            duration = self._calculate_duration(start_time, end_time)
-            
-            print(f"  {i}. {batch_id} - {status.upper()} ({batch_type}) - {duration}")
+            lines.append(f"  {i}. {batch_id} - {status.upper()} ({batch_type}) - {duration}")
+        
+        sys.stdout.write("\n".join(lines) + "\n")
     
-    def _show_detailed_batch_info(self, history_data: List[Dict]) -> None:
+    def _show_detailed_batch_info(self, history_data: List[Dict], durations_ms: List[Optional[float]]) -> None:
         """Show detailed information for each batch"""
-        for i, batch in enumerate(history_data, 1):
-            print(f"\n{'─'*60}")
-            print(f"BATCH {i}: {batch.get('id', 'N/A')}")
-            print('─'*60)
+        # One clock read for the whole dump; recency is compared in UTC
+        now_utc = datetime.now(timezone.utc)
+        for i, (batch, duration_ms) in enumerate(zip(history_data, durations_ms), 1):
+            # Buffer each batch block and emit it with a single write
+            lines = []
+            lines.append(f"\n{'─'*60}")
+            lines.append(f"BATCH {i}: {batch.get('id', 'N/A')}")
+            lines.append('─'*60)
             
-            print(f"Status:          {batch.get('status', 'unknown')}")
-            print(f"Type:            {'Full Build' if batch.get('isFullBuild') else 'Incremental Build'}")
-            print(f"Batch Type:      {batch.get('batchType', 'N/A')}")
+            lines.append(f"Status:          {batch.get('status', 'unknown')}")
+            lines.append(f"Type:            {'Full Build' if batch.get('isFullBuild') else 'Incremental Build'}")
+            lines.append(f"Batch Type:      {batch.get('batchType', 'N/A')}")
             
             # Format times
             create_date = batch.get("createDate", "")
@@ -209,30 +248,29 @@ class AggregateBuildHistory:
             end_time = batch.get("endTime", "")
             
             if create_date:
-                try:
-                    create_dt = datetime.fromisoformat(create_date.replace('Z', '+00:00'))
-                    print(f"Created:         {create_dt.strftime('%Y-%m-%d %H:%M:%S')}")
-                except:
-                    print(f"Created:         {create_date}")
+                create_dt = _try_parse_iso(create_date)
+                if create_dt is not None:
+                    lines.append(f"Created:         {create_dt.strftime('%Y-%m-%d %H:%M:%S')}")
+                else:
+                    lines.append(f"Created:         {create_date}")
             
             if start_time:
-                try:
-                    start_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-                    print(f"Started:         {start_dt.strftime('%Y-%m-%d %H:%M:%S')}")
-                except:
-                    print(f"Started:         {start_time}")
+                start_dt = _try_parse_iso(start_time)
+                if start_dt is not None:
+                    lines.append(f"Started:         {start_dt.strftime('%Y-%m-%d %H:%M:%S')}")
+                else:
+                    lines.append(f"Started:         {start_time}")
             
             if end_time:
-                try:
-                    end_dt = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
-                    print(f"Ended:           {end_dt.strftime('%Y-%m-%d %H:%M:%S')}")
-                except:
-                    print(f"Ended:           {end_time}")
+                end_dt = _try_parse_iso(end_time)
+                if end_dt is not None:
+                    lines.append(f"Ended:           {end_dt.strftime('%Y-%m-%d %H:%M:%S')}")
+                else:
+                    lines.append(f"Ended:           {end_time}")
             
             # Calculate and display duration
             if start_time and end_time:
-                duration = self._calculate_duration(start_time, end_time)
-                print(f"Duration:        {duration}")
+                lines.append(f"Duration:        {self._format_duration(duration_ms)}")
             
             # Other metrics
             estimate = batch.get("estimateTime", 0)
@@ -240,30 +278,19 @@ class AggregateBuildHistory:
                 estimate_str = f"{estimate}ms"
                 if estimate > 1000:
                     estimate_str = f"{estimate/1000:.1f}s"
-                print(f"Estimate:        {estimate_str}")
+                lines.append(f"Estimate:        {estimate_str}")
             
             total_build = batch.get("sumOfInstanceBuildTimes", "")
             if total_build:
                 total_build_str = self._parse_iso_duration(total_build)
-                print(f"Total Build:     {total_build_str}")
+                lines.append(f"Total Build:     {total_build_str}")
             
             # Check if this was recent (within last 24 hours)
-            if start_time:
-                try:
-                    start_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-                    time_since = datetime.now(start_dt.tzinfo) - start_dt
-                    if time_since.total_seconds() < 86400:  # 24 hours
-                        hours_ago = time_since.total_seconds() / 3600
-                        print(f"Recency:         {hours_ago:.1f} hours ago")
-                except:
-                    pass
-    
-    def _format_time(self, milliseconds: int) -> str:
-        """Format time in milliseconds to human readable format"""
-        if milliseconds < 1000:
-            return f"{milliseconds:.0f}ms"
-        elif milliseconds < 60000:
-            return f"{milliseconds/1000:.1f}s"
-        else:
-            minutes = milliseconds / 60000
-            return f"{minutes:.1f}min"
\ No newline at end of file
+            start_dt = _try_parse_iso(start_time)
+            if start_dt is not None:
+                time_since = now_utc - start_dt.astimezone(timezone.utc)
+                if time_since.total_seconds() < 86400:  # 24 hours
+                    hours_ago = time_since.total_seconds() / 3600
+                    lines.append(f"Recency:         {hours_ago:.1f} hours ago")
+            
+            sys.stdout.write("\n".join(lines) + "\n")
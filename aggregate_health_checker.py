@@ -1,6 +1,13 @@
 # aggregate_health_checker.py
 from datetime import datetime
 from typing import Dict, List
+from aggregate_view import EMPTY
+from time_format import format_ms
+
+# Health-check thresholds
+_OK_STATUSES = frozenset({"active"})
+_SLOW_BUILD_MS = 30_000
+_STALE_QUERY_DAYS = 30
 
 
 class AggregateHealthChecker:
@@ -11,7 +18,7 @@ class AggregateHealthChecker:
         """Check aggregate health for a specific cube"""
         try:
             print("\nFetching aggregates for cube...")
-            response = self.api_client.get_aggregates_by_cube(
+            response = self.api_client.get_aggregates_by_cube_cached(
                 cube_data["project_id"], 
                 cube_data["cube_id"]
             )
@@ -31,36 +38,42 @@ class AggregateHealthChecker:
             
             for agg in aggregates_data:
                 agg_id = agg.get("id", "Unknown")[:12] + "..."
-                status = agg.get("latest_instance", {}).get("status", "").lower()
-                rows = agg.get("latest_instance", {}).get("stats", {}).get("number_of_rows", 0)
-                build_time = agg.get("latest_instance", {}).get("stats", {}).get("build_duration", 0)
-                query_util = agg.get("stats", {}).get("query_utilization", 0)
-                last_query = agg.get("stats", {}).get("most_recent_query", "")
+                latest_instance = agg.get("latest_instance") or EMPTY
+                instance_stats = latest_instance.get("stats") or EMPTY
+                agg_stats = agg.get("stats") or EMPTY
+                
+                raw_status = latest_instance.get("status", "")
+                # Statuses usually arrive lowercase already; only normalize the rest
+                status = raw_status if raw_status in _OK_STATUSES else raw_status.lower()
+                rows = instance_stats.get("number_of_rows", 0)
+                build_time = instance_stats.get("build_duration", 0)
+                query_util = agg_stats.get("query_utilization", 0)
+                last_query = agg_stats.get("most_recent_query", "")
                 
                 # Check for inactive aggregates
-                if status != "active":
+                if status not in _OK_STATUSES:
                     issues.append(f"✗ {agg_id}: Status is '{status}'")
                 
                 # Check for aggregates with 0 rows
                 if rows == 0:
                     warnings.append(f"⚠ {agg_id}: Has 0 rows")
                 
-                # Check for very slow builds (> 30 seconds)
-                if build_time > 30000:  # 30 seconds in milliseconds
-                    warnings.append(f"⚠ {agg_id}: Slow build ({self._format_time(build_time)})")
+                # Check for very slow builds
+                if build_time > _SLOW_BUILD_MS:
+                    warnings.append(f"⚠ {agg_id}: Slow build ({format_ms(build_time)})")
                 
                 # Check for aggregates with no queries
                 if query_util == 0 and last_query == "":
                     warnings.append(f"⚠ {agg_id}: No query utilization")
                 
-                # Check for old queries (older than 30 days)
-                if last_query and last_query != "never":
+                # Check for stale queries (values that can't be ISO timestamps are skipped without a parse attempt)
+                if last_query and last_query != "never" and len(last_query) >= 16 and 'T' in last_query:
                     try:
                         query_date = datetime.fromisoformat(last_query.replace('Z', '+00:00'))
                         days_old = (datetime.now(query_date.tzinfo) - query_date).days
-                        if days_old > 30:
+                        if days_old > _STALE_QUERY_DAYS:
                             warnings.append(f"⚠ {agg_id}: Last query {days_old} days ago")
-                    except:
+                    except (ValueError, TypeError):
                         pass
             
             print(f"\nIssues Found ({len(issues)}):")
@@ -97,13 +110,3 @@ class AggregateHealthChecker:
             
         except Exception as e:
             print(f"Error: {e}")
-    
-    def _format_time(self, milliseconds: int) -> str:
-        """Format time in milliseconds to human readable format"""
-        if milliseconds < 1000:
-            return f"{milliseconds:.0f}ms"
-        elif milliseconds < 60000:
-            return f"{milliseconds/1000:.1f}s"
-        else:
-            minutes = milliseconds / 60000
-            return f"{minutes:.1f}min"
\ No newline at end of file
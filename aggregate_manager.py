@@ -1,8 +1,13 @@
 # aggregate_manager.py
-import json
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from api_client import AtScaleAPIClient
-from ui_components import ScrollableList, display_table, confirm_action
+from config import dumps_indented
+from ui_components import SimpleListSelector, display_table, confirm_action
+
+# Rows rendered per table page in the detailed aggregate listing
+TABLE_PAGE_SIZE = 50
+
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
 
 
 class AggregateManager:
@@ -20,16 +25,18 @@ class AggregateManager:
             if detailed:
                 # Display detailed table view
                 columns = ["id", "name", "status", "size", "last_refresh"]
-                display_data = []
-                for agg in aggregates:
-                    display_data.append({
-                        "id": agg.get("id", "")[:20] + "...",
-                        "name": agg.get("name", ""),
-                        "status": agg.get("status", "unknown"),
-                        "size": self._format_size(agg.get("size", 0)),
-                        "last_refresh": agg.get("last_refresh_time", "never")
-                    })
-                display_table(display_data, columns)
+                # Rows are formatted lazily, one table page at a time
+                display_data = (
+                    (
+                        agg.get("id", "")[:20] + "...",
+                        agg.get("name", ""),
+                        agg.get("status", "unknown"),
+                        self._format_size(agg.get("size", 0)),
+                        agg.get("last_refresh_time", "never")
+                    )
+                    for agg in aggregates
+                )
+                display_table(display_data, columns, page_size=TABLE_PAGE_SIZE)
             else:
                 # Simple list for selection
                 print(f"\nFound {len(aggregates)} aggregates:")
@@ -41,22 +48,14 @@ class AggregateManager:
             print(f"Error fetching aggregates: {e}")
 
     def select_aggregate(self) -> Optional[Dict]:
-        """Select an aggregate from a scrollable list"""
+        """Select an aggregate from a numbered list"""
         try:
             aggregates = self.api_client.get_aggregates()
             if not aggregates:
                 print("No aggregates found.")
                 return None
 
-            # Create scrollable list
-            list_ui = ScrollableList(
-                aggregates,
-                title="Select an Aggregate",
-                page_size=15
-            )
-
-            selected = list_ui.navigate()
-            return selected
+            return SimpleListSelector(aggregates, title="Select an Aggregate").select()
 
         except Exception as e:
             print(f"Error: {e}")
@@ -69,7 +68,7 @@ class AggregateManager:
             print("\n" + "="*60)
             print("AGGREGATE DETAILS")
             print("="*60)
-            print(json.dumps(details, indent=2, default=str))
+            print(dumps_indented(details))
         except Exception as e:
             print(f"Error fetching details: {e}")
 
@@ -138,9 +137,9 @@ class AggregateManager:
         """Format size in bytes to human-readable format"""
         if size_bytes == 0:
             return "0 B"
-        units = ['B', 'KB', 'MB', 'GB', 'TB']
-        i = 0
-        while size_bytes >= 1024 and i < len(units) - 1:
-            size_bytes /= 1024.0
-            i += 1
-        return f"{size_bytes:.1f} {units[i]}"
\ No newline at end of file
+        if size_bytes < 1024:
+            # Fractional and negative sizes stay in bytes (bit_length() would give a negative index)
+            return f"{size_bytes:.1f} B"
+        # Each unit step is a factor of 2**10, so the unit index follows from the bit length
+        i = min((int(size_bytes).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+        return f"{size_bytes / (1 << (i * 10)):.1f} {_SIZE_UNITS[i]}"
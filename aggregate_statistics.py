@@ -1,6 +1,11 @@
 # aggregate_statistics.py
+import math
+import sys
+from collections import Counter
 from datetime import datetime
 from typing import Dict, List
+from aggregate_view import EMPTY
+from time_format import format_ms
 
 
 class AggregateStatistics:
@@ -11,7 +16,7 @@ class AggregateStatistics:
         """Show aggregate statistics for a specific cube"""
         try:
             print("\nFetching aggregates for cube...")
-            response = self.api_client.get_aggregates_by_cube(
+            response = self.api_client.get_aggregates_by_cube_cached(
                 cube_data["project_id"], 
                 cube_data["cube_id"]
             )
@@ -24,101 +29,101 @@ class AggregateStatistics:
             
             total_aggregates = response.get("response", {}).get("total", 0)
             
-            print(f"\n{'='*60}")
-            print(f"AGGREGATE STATISTICS - {cube_data['display']}")
-            print('='*60)
-            print(f"Total Aggregates: {total_aggregates}")
-            print(f"Fetched in this batch: {len(aggregates_data)}")
+            # Buffer the report block and emit it with a single write
+            lines = []
+            lines.append(f"\n{'='*60}")
+            lines.append(f"AGGREGATE STATISTICS - {cube_data['display']}")
+            lines.append('='*60)
+            lines.append(f"Total Aggregates: {total_aggregates}")
+            lines.append(f"Fetched in this batch: {len(aggregates_data)}")
             
             # Type breakdown
-            type_count = {}
-            subtype_count = {}
-            status_count = {}
+            type_count = Counter(agg.get("type", "unknown") for agg in aggregates_data)
+            subtype_count = Counter(agg.get("subtype", "unknown") for agg in aggregates_data)
+            status_count = Counter()
             total_rows = 0
             total_build_time = 0
             total_query_utilization = 0
             active_count = 0
+            # Extremes are tracked as (value, aggregate) while scanning
+            fastest_time = smallest_rows = math.inf
+            slowest_time = largest_rows = -math.inf
+            fastest = slowest = largest = smallest = EMPTY
             
             for agg in aggregates_data:
-                agg_type = agg.get("type", "unknown")
-                agg_subtype = agg.get("subtype", "unknown")
-                status = agg.get("latest_instance", {}).get("status", "unknown")
-                rows = agg.get("latest_instance", {}).get("stats", {}).get("number_of_rows", 0)
-                build_time = agg.get("latest_instance", {}).get("stats", {}).get("build_duration", 0)
-                query_util = agg.get("stats", {}).get("query_utilization", 0)
+                latest_instance = agg.get("latest_instance") or EMPTY
+                instance_stats = latest_instance.get("stats") or EMPTY
+                status = latest_instance.get("status", "unknown")
+                rows = instance_stats.get("number_of_rows", 0)
+                build_time = instance_stats.get("build_duration", 0)
+                query_util = (agg.get("stats") or EMPTY).get("query_utilization", 0)
                 
-                type_count[agg_type] = type_count.get(agg_type, 0) + 1
-                subtype_count[agg_subtype] = subtype_count.get(agg_subtype, 0) + 1
-                status_count[status] = status_count.get(status, 0) + 1
+                status_count[status] += 1
                 total_rows += rows
                 total_build_time += build_time
                 total_query_utilization += query_util
                 
+                if build_time < fastest_time:
+                    fastest_time, fastest = build_time, agg
+                if build_time > slowest_time:
+                    slowest_time, slowest = build_time, agg
+                if rows > largest_rows:
+                    largest_rows, largest = rows, agg
+                if rows < smallest_rows:
+                    smallest_rows, smallest = rows, agg
+                
                 if status.lower() == "active":
                     active_count += 1
             
-            print(f"\nType Breakdown:")
+            lines.append(f"\nType Breakdown:")
             for agg_type, count in sorted(type_count.items()):
                 percentage = (count / len(aggregates_data)) * 100
-                print(f"  {agg_type.replace('_', ' ').title():25} {count:3d} ({percentage:.1f}%)")
+                lines.append(f"  {agg_type.replace('_', ' ').title():25} {count:3d} ({percentage:.1f}%)")
             
-            print(f"\nSubtype Breakdown:")
+            lines.append(f"\nSubtype Breakdown:")
             for subtype, count in sorted(subtype_count.items()):
                 percentage = (count / len(aggregates_data)) * 100
-                print(f"  {subtype.replace('_', ' ').title():25} {count:3d} ({percentage:.1f}%)")
+                lines.append(f"  {subtype.replace('_', ' ').title():25} {count:3d} ({percentage:.1f}%)")
             
-            print(f"\nStatus Breakdown:")
+            lines.append(f"\nStatus Breakdown:")
             for status, count in sorted(status_count.items()):
                 percentage = (count / len(aggregates_data)) * 100
-                print(f"  {status.title():15} {count:3d} ({percentage:.1f}%)")
+                lines.append(f"  {status.title():15} {count:3d} ({percentage:.1f}%)")
             
-            print(f"\nBuild Statistics:")
+            lines.append(f"\nBuild Statistics:")
             avg_build_time = total_build_time / len(aggregates_data) if aggregates_data else 0
-            print(f"  Total Build Time:     {self._format_time(total_build_time)}")
-            print(f"  Average Build Time:   {self._format_time(avg_build_time)}")
+            lines.append(f"  Total Build Time:     {format_ms(total_build_time)}")
+            lines.append(f"  Average Build Time:   {format_ms(avg_build_time)}")
             
-            print(f"\nRow Statistics:")
-            print(f"  Total Rows:          {total_rows:,}")
+            lines.append(f"\nRow Statistics:")
+            lines.append(f"  Total Rows:          {total_rows:,}")
             if aggregates_data:
                 avg_rows = total_rows / len(aggregates_data)
-                print(f"  Average Rows/Agg:    {avg_rows:,.0f}")
+                lines.append(f"  Average Rows/Agg:    {avg_rows:,.0f}")
             
-            print(f"\nQuery Utilization:")
+            lines.append(f"\nQuery Utilization:")
             avg_query_util = total_query_utilization / len(aggregates_data) if aggregates_data else 0
-            print(f"  Average Utilization:  {avg_query_util:.1f}")
+            lines.append(f"  Average Utilization:  {avg_query_util:.1f}")
             
             # Find aggregates with extremes
             if aggregates_data:
-                fastest = min(aggregates_data, key=lambda x: x.get("latest_instance", {}).get("stats", {}).get("build_duration", 0))
-                slowest = max(aggregates_data, key=lambda x: x.get("latest_instance", {}).get("stats", {}).get("build_duration", 0))
-                largest = max(aggregates_data, key=lambda x: x.get("latest_instance", {}).get("stats", {}).get("number_of_rows", 0))
-                smallest = min(aggregates_data, key=lambda x: x.get("latest_instance", {}).get("stats", {}).get("number_of_rows", 0))
-                
-                print(f"\nFastest Build:")
-                print(f"  ID:     {fastest.get('id', 'N/A')[:15]}...")
-                print(f"  Time:   {self._format_time(fastest.get('latest_instance', {}).get('stats', {}).get('build_duration', 0))}")
+                lines.append(f"\nFastest Build:")
+                lines.append(f"  ID:     {fastest.get('id', 'N/A')[:15]}...")
+                lines.append(f"  Time:   {format_ms(fastest_time)}")
                 
-                print(f"\nSlowest Build:")
-                print(f"  ID:     {slowest.get('id', 'N/A')[:15]}...")
-                print(f"  Time:   {self._format_time(slowest.get('latest_instance', {}).get('stats', {}).get('build_duration', 0))}")
+                lines.append(f"\nSlowest Build:")
+                lines.append(f"  ID:     {slowest.get('id', 'N/A')[:15]}...")
+                lines.append(f"  Time:   {format_ms(slowest_time)}")
                 
-                print(f"\nLargest Aggregate:")
-                print(f"  ID:     {largest.get('id', 'N/A')[:15]}...")
-                print(f"  Rows:   {largest.get('latest_instance', {}).get('stats', {}).get('number_of_rows', 0):,}")
+                lines.append(f"\nLargest Aggregate:")
+                lines.append(f"  ID:     {largest.get('id', 'N/A')[:15]}...")
+                lines.append(f"  Rows:   {largest_rows:,}")
                 
-                print(f"\nSmallest Aggregate:")
-                print(f"  ID:     {smallest.get('id', 'N/A')[:15]}...")
-                print(f"  Rows:   {smallest.get('latest_instance', {}).get('stats', {}).get('number_of_rows', 0):,}")
+                lines.append(f"\nSmallest Aggregate:")
+                lines.append(f"  ID:     {smallest.get('id', 'N/A')[:15]}...")
+                lines.append(f"  Rows:   {smallest_rows:,}")
+            
+            sys.stdout.write("\n".join(lines) + "\n")
             
         except Exception as e:
             print(f"Error: {e}")
-    
-    def _format_time(self, milliseconds: int) -> str:
-        """Format time in milliseconds to human readable format"""
-        if milliseconds < 1000:
-            return f"{milliseconds:.0f}ms"
-        elif milliseconds < 60000:
-            return f"{milliseconds/1000:.1f}s"
-        else:
-            minutes = milliseconds / 60000
-            return f"{minutes:.1f}min"
\ No newline at end of file
@@ -0,0 +1,69 @@
+# aggregate_view.py
+from typing import Dict, NamedTuple
+
+# Read-only default for missing nested objects (avoids allocating {} per lookup); never mutate it
+EMPTY: Dict = {}
+
+
+class AggregateView(NamedTuple):
+    """Flat, read-only aggregate record; field order matches the CSV export columns"""
+    aggregate_id: str
+    aggregate_name: str
+    type: str
+    subtype: str
+    status: str
+    rows: int
+    build_duration_ms: int
+    avg_build_duration_ms: int
+    query_utilization: int
+    last_query_time: str
+    created_at: str
+    table_name: str
+    table_schema: str
+    batch_id: str
+    connection_id: str
+    key_count: int
+    measure_count: int
+    dimension_count: int
+    total_attributes: int
+
+    @classmethod
+    def from_installer(cls, agg: Dict) -> "AggregateView":
+        """Build a view from an installer-format aggregate record"""
+        latest_instance = agg.get("latest_instance") or EMPTY
+        instance_stats = latest_instance.get("stats") or EMPTY
+        agg_stats = agg.get("stats") or EMPTY
+
+        # Count attribute types
+        attributes = agg.get("attributes", [])
+        key_count = measure_count = dimension_count = 0
+        for attr in attributes:
+            attr_type = attr.get("type")
+            if attr_type == "key":
+                key_count += 1
+            elif attr_type == "measure":
+                measure_count += 1
+            elif attr_type == "dimension":
+                dimension_count += 1
+
+        return cls(
+            agg.get("id", ""),
+            agg.get("name", ""),
+            agg.get("type", ""),
+            agg.get("subtype", ""),
+            latest_instance.get("status", ""),
+            instance_stats.get("number_of_rows", 0),
+            instance_stats.get("build_duration", 0),
+            agg_stats.get("average_build_duration", 0),
+            agg_stats.get("query_utilization", 0),
+            agg_stats.get("most_recent_query", ""),
+            agg_stats.get("created_at", ""),
+            latest_instance.get("table_name", ""),
+            latest_instance.get("table_schema", ""),
+            latest_instance.get("batch_id", ""),
+            latest_instance.get("connection_id", ""),
+            key_count,
+            measure_count,
+            dimension_count,
+            len(attributes)
+        )
@@ -1,18 +1,69 @@
+import time
+from types import MappingProxyType
 import requests
-from typing import Dict, List, Optional, Any
-from config import get_jwt, get_container_jwt, load_config, normalize_host, urlparse
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Any, Tuple, Union
+from aggregate_view import AggregateView
+from http2_session import Http2Response, Http2Session, http2_available
+from config import (
+    clear_jwt_cache, get_jwt, get_jwt_version, get_container_jwt, json_loads, load_config, normalize_host, urlparse
+)
+
+try:
+    import ijson
+except ImportError:  # optional; without it streamed responses are decoded in one piece
+    ijson = None
+
+# Upper bound on concurrent page requests issued against the AtScale host
+MAX_PAGE_WORKERS = 8
+
+# Connection pool sizing for the shared session (must cover MAX_PAGE_WORKERS; pools are never nested)
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 20
+
+# Bodies smaller than this are decoded whole; incremental decoding only pays off on large responses
+STREAM_DECODE_MIN_BYTES = 256 * 1024
+
+# Seconds a cube's aggregate listing is reused between reports in the same session
+AGGREGATES_CACHE_TTL = 60
 
 
 class AtScaleAPIClient:
     def __init__(self):
         self.config = load_config()
+        self.is_installer = self.config.get("instance_type") == "installer"
         self.base_url = self._get_base_url()
+        self.session = self._create_session()
+        
+        # Resolve per-instance URL prefixes and response transforms once instead of on every call
+        if self.is_installer:
+            # Installer public API is served on port 10502
+            self.org = self.config["organization"]
+            self.api_url = self._build_installer_url(10502, "")
+            self._transform_catalogs = lambda data: data.get("response", [])
+            self._transform_aggregates = lambda data, catalog_id, model_id: data
+            self._transform_build_history = lambda data: data
+        else:
+            self.org = None
+            self.api_url = self.base_url
+            self._transform_catalogs = self._transform_container_catalogs
+            self._transform_aggregates = self._transform_container_aggregates
+            self._transform_build_history = self._transform_container_build_history
+        
+        # Read-only public headers, rebuilt when config's JWT version changes
+        self._public_headers: Optional[Mapping[str, str]] = None
+        self._public_headers_version = -1
+        
+        # (catalog_id, model_id) -> (fetched_at, response)
+        self._cube_aggregates_cache: Dict[Tuple[str, str], Tuple[float, Dict]] = {}
         
     def _get_base_url(self) -> str:
         """Get base URL based on instance type"""
         host = normalize_host(self.config["host"])
         
-        if self.config.get("instance_type") == "installer":
+        if self.is_installer:
             org = self.config["organization"]
             parsed_url = urlparse(host)
             netloc = parsed_url.netloc
@@ -21,6 +72,38 @@ class AtScaleAPIClient:
         else:  # container
             return host  # Already normalized with protocol
     
+    def _create_session(self) -> Union[requests.Session, Http2Session]:
+        """Create a pooled session so calls reuse TCP/TLS connections"""
+        if self.config.get("use_http2"):
+            if http2_available():
+                # One multiplexed connection carries the concurrent per-cube requests
+                session = Http2Session(max_connections=POOL_MAXSIZE, max_keepalive_connections=POOL_CONNECTIONS)
+                session.headers.update({"Accept-Encoding": "gzip, deflate"})
+                return session
+            print("⚠️  use_http2 is set in config.json but httpx[http2] is not installed; using HTTP/1.1")
+        
+        session = requests.Session()
+        session.verify = False
+        # Request compressed JSON and persistent connections explicitly; per-call headers are merged over these
+        session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+        # Retry transient gateway errors; urllib3 only retries idempotent methods by default.
+        # raise_on_status=False hands the last response back so raise_for_status() reports it.
+        retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504], raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=retries)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+    
+    def close(self) -> None:
+        """Close pooled connections held by the session"""
+        self.session.close()
+    
+    def __enter__(self) -> "AtScaleAPIClient":
+        return self
+    
+    def __exit__(self, *args) -> None:
+        self.close()
+    
     def _build_installer_url(self, port: int, path: str) -> str:
         """Build URL for installer instance with specific port"""
         host = normalize_host(self.config["host"])
@@ -32,18 +115,24 @@ class AtScaleAPIClient:
             netloc = netloc.split(':')[0]
         return f"{parsed_url.scheme}://{netloc}:{port}{path}"
     
-    def _get_public_headers(self) -> Dict[str, str]:
-        """Get headers for public API (uses static token)"""
-        headers = {
-            "Authorization": f"Bearer {get_jwt()}",  # Static token for container
+    def _get_public_headers(self) -> Mapping[str, str]:
+        """Get headers for public API (uses static token), shared until the token changes"""
+        if self._public_headers is not None and self._public_headers_version == get_jwt_version():
+            return self._public_headers
+        
+        token = get_jwt()
+        # requests copies headers into each prepared request, so one read-only mapping can be shared
+        self._public_headers = MappingProxyType({
+            "Authorization": f"Bearer {token}",  # Static token for container
             "Content-Type": "application/json",
             "Accept": "application/json"
-        }
-        return headers
+        })
+        self._public_headers_version = get_jwt_version()
+        return self._public_headers
     
-    def _get_private_headers(self) -> Optional[Dict[str, str]]:
+    def _get_private_headers(self) -> Optional[Mapping[str, str]]:
         """Get headers for private API (uses JWT via OIDC)"""
-        if self.config.get("instance_type") != "container":
+        if self.is_installer:
             return self._get_public_headers()
         
         # For container, get JWT for private API
@@ -58,126 +147,157 @@ class AtScaleAPIClient:
             # No Accept to match curl exactly
         }
 
+    def _request(self, method: str, url: str, private: bool = False, **kwargs) -> Union[requests.Response, Http2Response]:
+        """Send a request with public (or private) API headers, retrying once with fresh tokens on 401"""
+        get_headers = self._get_private_headers if private else self._get_public_headers
+        response = self.session.request(method, url, headers=get_headers(), verify=False, **kwargs)
+        if response.status_code == 401:
+            # Token expired or was revoked server-side; drop cached tokens and try once more
+            response.close()
+            clear_jwt_cache()
+            response = self.session.request(method, url, headers=get_headers(), verify=False, **kwargs)
+        return response
+
     def get_published_projects(self) -> List[Dict]:
-        """Get published catalogs with models - PUBLIC API"""
-        if self.config.get("instance_type") == "installer":
-            org = self.config["organization"]
-            # Use port 10502 for this endpoint
-            url = self._build_installer_url(10502, f"/projects/published/orgId/{org}")
-            headers = self._get_public_headers()
+        """Get published catalogs with models (uncached; projects_util.get_projects caches them) - PUBLIC API"""
+        if self.is_installer:
+            url = f"{self.api_url}/projects/published/orgId/{self.org}"
         else:
             # CONTAINER PUBLIC API ENDPOINT
-            url = f"{self.base_url}/v1/catalogs"
-            headers = self._get_public_headers()
+            url = f"{self.api_url}/v1/catalogs"
         
-        response = requests.get(
-            url, headers=headers, verify=False, timeout=30
-        )
+        response = self._request("GET", url, timeout=30)
         response.raise_for_status()
-        data = response.json()
-        
-        if self.config.get("instance_type") == "installer":
-            return data.get("response", [])
-        else:
-            return self._transform_container_catalogs(data)
+        return self._transform_catalogs(json_loads(response.content))
     
     def _transform_container_catalogs(self, catalogs_data: List[Dict]) -> List[Dict]:
         """Transform /v1/catalogs response to match installer format"""
-        transformed = []
-        
-        for catalog in catalogs_data:
-            catalog_id = catalog.get("id", "")
-            catalog_name = catalog.get("name", "Unknown Catalog")
-            
-            cubes = []
-            for model in catalog.get("models", []):
-                cubes.append({
-                    "id": model.get("id", ""),
-                    "name": model.get("name", "Unknown Cube"),
-                    "caption": model.get("caption", ""),
-                    "type": "model"
-                })
-            
-            transformed.append({
-                "id": catalog_id,
-                "name": catalog_name,
-                "cubes": cubes
-            })
-        
-        return transformed
+        return [
+            {
+                "id": catalog.get("id", ""),
+                "name": catalog.get("name", "Unknown Catalog"),
+                "cubes": [
+                    {
+                        "id": model.get("id", ""),
+                        "name": model.get("name", "Unknown Cube"),
+                        "caption": model.get("caption", ""),
+                        "type": "model"
+                    }
+                    for model in catalog.get("models", ())
+                ]
+            }
+            for catalog in catalogs_data
+        ]
+
+    def _aggregates_by_cube_url(self, catalog_id: str, model_id: str, limit: int, offset: int) -> str:
+        """Build the aggregates-by-cube URL for the configured instance type"""
+        if self.is_installer:
+            return f"{self.api_url}/aggregates/orgId/{self.org}?limit={limit}&offset={offset}&projectId={catalog_id}&cubeId={model_id}"
+        # CONTAINER PUBLIC API ENDPOINT
+        return f"{self.api_url}/v1/aggregates/instances?catalogId={catalog_id}&modelId={model_id}"
 
-    def get_aggregates_by_cube(self, catalog_id: str, model_id: str, limit: int = 200) -> Dict:
+    def get_aggregates_by_cube(self, catalog_id: str, model_id: str, limit: int = 200, offset: int = 0) -> Dict:
         """Get aggregates for a specific cube/model - PUBLIC API"""
-        if self.config.get("instance_type") == "installer":
-            org = self.config["organization"]
-            # Use port 10502 for this endpoint
-            url = self._build_installer_url(10502, f"/aggregates/orgId/{org}?limit={limit}&projectId={catalog_id}&cubeId={model_id}")
-        else:
-            # CONTAINER PUBLIC API ENDPOINT
-            url = f"{self.base_url}/v1/aggregates/instances?catalogId={catalog_id}&modelId={model_id}"
+        url = self._aggregates_by_cube_url(catalog_id, model_id, limit, offset)
         
-        response = requests.get(
-            url, headers=self._get_public_headers(), verify=False, timeout=30
-        )
+        response = self._request("GET", url, timeout=30)
         response.raise_for_status()
-        data = response.json()
+        return self._transform_aggregates(json_loads(response.content), catalog_id, model_id)
+    
+    def iter_aggregates_by_cube(self, catalog_id: str, model_id: str, limit: int = 200) -> Iterator[Dict]:
+        """Yield every aggregate for a cube/model in installer format, decoding each response as it streams - PUBLIC API"""
+        if self.is_installer:
+            return self._iter_raw_aggregates(catalog_id, model_id, limit)
+        return (
+            self._transform_container_aggregate(agg, catalog_id, model_id)
+            for agg in self._iter_raw_aggregates(catalog_id, model_id, limit)
+        )
+    
+    def iter_aggregate_views(self, catalog_id: str, model_id: str, limit: int = 200) -> Iterator[AggregateView]:
+        """Yield every aggregate for a cube/model as a flat AggregateView - PUBLIC API"""
+        # Container records go through the same installer-format transform as every other caller
+        return map(AggregateView.from_installer, self.iter_aggregates_by_cube(catalog_id, model_id, limit))
+    
+    def _iter_raw_aggregates(self, catalog_id: str, model_id: str, limit: int) -> Iterator[Dict]:
+        """Yield untransformed aggregate records, following installer paging
+
+        Paging ends once the reported total has been read; without a total,
+        a page shorter than limit marks the end.
+        """
+        offset = 0
+        while True:
+            url = self._aggregates_by_cube_url(catalog_id, model_id, limit, offset)
+            with self._request("GET", url, timeout=30, stream=True) as response:
+                response.raise_for_status()
+                if not self.is_installer:
+                    # Container endpoint is not paged
+                    yield from self._iter_json_items(response, "data")
+                    return
+                
+                count = 0
+                meta: Dict[str, Any] = {}
+                for agg in self._iter_json_items(response, "response.data", meta):
+                    count += 1
+                    yield agg
+            
+            # Advance by what was returned, in case the server caps limit below the requested size
+            offset += count
+            total = meta.get("total")
+            if total is not None:
+                if count == 0 or offset >= total:
+                    return
+            elif count < limit:
+                return
+    
+    def _iter_json_items(self, response: Union[requests.Response, Http2Response], path: str,
+                         meta: Optional[Dict[str, Any]] = None) -> Iterator[Dict]:
+        """Yield the elements of the array at a dotted path in a streamed JSON response
+
+        Uses ijson when installed so records are produced while the body downloads;
+        small or fixed-size bodies below STREAM_DECODE_MIN_BYTES are decoded whole.
+        When meta is given, the "total" next to the array is stored in it (once
+        the body has been read to the end).
+        """
+        parent_path, _, array_key = path.rpartition(".")
+        content_length = int(response.headers.get("Content-Length") or 0)
+        if ijson is None or 0 < content_length < STREAM_DECODE_MIN_BYTES:
+            parent = json_loads(response.content)
+            for key in parent_path.split(".") if parent_path else ():
+                parent = parent.get(key) or {}
+            if meta is not None and parent.get("total") is not None:
+                meta["total"] = parent["total"]
+            yield from parent.get(array_key) or []
+            return
         
-        if self.config.get("instance_type") == "installer":
-            return data
-        else:
-            return self._transform_container_aggregates(data, catalog_id, model_id)
+        # Let urllib3 undo any gzip/deflate transfer encoding before ijson sees the bytes
+        response.raw.decode_content = True
+        item_prefix = f"{path}.item"
+        if meta is None:
+            yield from ijson.items(response.raw, item_prefix, use_float=True)
+            return
+        
+        # Build items from parse events so the sibling total can be picked up in the same pass
+        total_prefix = f"{parent_path}.total" if parent_path else "total"
+        builder = None
+        for prefix, event, value in ijson.parse(response.raw, use_float=True):
+            if builder is not None:
+                builder.event(event, value)
+                if prefix == item_prefix and event == "end_map":
+                    yield builder.value
+                    builder = None
+            elif prefix == item_prefix and event == "start_map":
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+            elif prefix == total_prefix and event == "number":
+                meta["total"] = value
     
     def _transform_container_aggregates(self, container_data: Dict, catalog_id: str, model_id: str) -> Dict:
         """Transform /v1/aggregates/instances response to match installer format"""
         aggregates = container_data.get("data", [])
         
-        transformed_aggregates = []
-        for agg in aggregates:
-            stats = agg.get("stats", {})
-            
-            transformed = {
-                "id": agg.get("definitionId", ""),
-                "name": agg.get("definitionId", ""),
-                "type": "system_defined",
-                "subtype": "prediction_defined",
-                "attributes": [],
-                "project_id": agg.get("catalogId", catalog_id),
-                "cube_id": agg.get("modelId", model_id),
-                "connection_id": agg.get("connectionId", ""),
-                "incremental": False,
-                "stats": {
-                    "created_at": "",
-                    "average_build_duration": stats.get("buildDuration", 0),
-                    "query_utilization": 0,
-                    "most_recent_query": ""
-                },
-                "latest_instance": {
-                    "id": agg.get("id", ""),
-                    "status": agg.get("status", "unknown"),
-                    "message": agg.get("message", ""),
-                    "table_name": agg.get("tableName", ""),
-                    "table_schema": agg.get("tableSchema", ""),
-                    "batch_id": agg.get("buildQueryId", ""),
-                    "connection_id": agg.get("connectionId", ""),
-                    "stats": {
-                        "materialization_start_time": stats.get("materializationStartTime", ""),
-                        "materialization_end_time": stats.get("materializationEndTime", ""),
-                        "build_duration": stats.get("buildDuration", 0),
-                        "number_of_rows": stats.get("numberOfRows", 0)
-                    }
-                },
-                "active_instance": {
-                    "id": agg.get("id", ""),
-                    "status": agg.get("status", "unknown"),
-                    "message": agg.get("message", ""),
-                    "table_name": agg.get("tableName", ""),
-                    "table_schema": agg.get("tableSchema", ""),
-                    "batch_id": agg.get("buildQueryId", ""),
-                    "connection_id": agg.get("connectionId", ""),
-                    "stats": stats
-                }
-            }
-            transformed_aggregates.append(transformed)
+        transformed_aggregates = [
+            self._transform_container_aggregate(agg, catalog_id, model_id) for agg in aggregates
+        ]
         
         return {
             "response": {
@@ -187,40 +307,76 @@ class AtScaleAPIClient:
                 "offset": 0
             }
         }
+    
+    def _transform_container_aggregate(self, agg: Dict, catalog_id: str, model_id: str) -> Dict:
+        """Transform one container aggregate instance to the installer record shape"""
+        stats = agg.get("stats", {})
+        
+        # Container instances are both the latest and the active one, so both keys share one dict
+        instance = {
+            "id": agg.get("id", ""),
+            "status": agg.get("status", "unknown"),
+            "message": agg.get("message", ""),
+            "table_name": agg.get("tableName", ""),
+            "table_schema": agg.get("tableSchema", ""),
+            "batch_id": agg.get("buildQueryId", ""),
+            "connection_id": agg.get("connectionId", ""),
+            "stats": {
+                "materialization_start_time": stats.get("materializationStartTime", ""),
+                "materialization_end_time": stats.get("materializationEndTime", ""),
+                "build_duration": stats.get("buildDuration", 0),
+                "number_of_rows": stats.get("numberOfRows", 0)
+            }
+        }
+        
+        return {
+            "id": agg.get("definitionId", ""),
+            "name": agg.get("definitionId", ""),
+            "type": "system_defined",
+            "subtype": "prediction_defined",
+            "attributes": [],
+            "project_id": agg.get("catalogId", catalog_id),
+            "cube_id": agg.get("modelId", model_id),
+            "connection_id": agg.get("connectionId", ""),
+            "incremental": False,
+            "stats": {
+                "created_at": "",
+                "average_build_duration": stats.get("buildDuration", 0),
+                "query_utilization": 0,
+                "most_recent_query": ""
+            },
+            "latest_instance": instance,
+            "active_instance": instance
+        }
 
     def rebuild_cube(self, catalog_id: str, model_id: str, is_full_build: bool = True) -> Dict:
         """Rebuild aggregates for a cube - PUBLIC API"""
-        if self.config.get("instance_type") == "installer":
-            org = self.config["organization"]
-            # Use port 10502 for this endpoint
-            url = self._build_installer_url(10502, f"/aggregate-batch/orgId/{org}/projectId/{catalog_id}?cubeId={model_id}&isFullBuild={str(is_full_build).lower()}")
+        # Aggregate instances change once the rebuild runs
+        self._cube_aggregates_cache.pop((catalog_id, model_id), None)
+        
+        if self.is_installer:
+            url = f"{self.api_url}/aggregate-batch/orgId/{self.org}/projectId/{catalog_id}?cubeId={model_id}&isFullBuild={str(is_full_build).lower()}"
             
-            response = requests.post(
-                url, headers=self._get_public_headers(), verify=False, timeout=60
-            )
+            response = self._request("POST", url, timeout=60)
         else:
             # CONTAINER PUBLIC API ENDPOINT
-            url = f"{self.base_url}/v1/aggregates-batch/catalogs/{catalog_id}/models/{model_id}?isFullBuild={str(is_full_build).lower()}"
+            url = f"{self.api_url}/v1/aggregates-batch/catalogs/{catalog_id}/models/{model_id}?isFullBuild={str(is_full_build).lower()}"
             
             data = {"gracePeriodOverrides": {}}
             
-            response = requests.post(
-                url, headers=self._get_public_headers(), json=data, verify=False, timeout=60
-            )
+            response = self._request("POST", url, json=data, timeout=60)
         
         response.raise_for_status()
-        return response.json()
+        return json_loads(response.content)
 
-    def get_aggregate_build_history(self, catalog_id: str, model_id: str, limit: int = 20) -> Dict:
+    def get_aggregate_build_history(self, catalog_id: str, model_id: str, limit: int = 20, offset: int = 0) -> Dict:
         """Get aggregate build history - PRIVATE API (requires JWT for container)"""
-        if self.config.get("instance_type") == "installer":
-            org = self.config["organization"]
-            # Use port 10502 for this endpoint
-            url = self._build_installer_url(10502, f"/aggregate-batch/orgId/{org}/history?limit={limit}&projectId={catalog_id}&cubeId={model_id}")
-            headers = self._get_public_headers()
+        if self.is_installer:
+            url = f"{self.api_url}/aggregate-batch/orgId/{self.org}/history?limit={limit}&offset={offset}&projectId={catalog_id}&cubeId={model_id}"
         else:
-            # CONTAINER PRIVATE API ENDPOINT - requires JWT
-            url = f"{self.base_url}/wapi/p/aggregate/batch-history?page=1&limit={limit}&catalogId={catalog_id}&modelId={model_id}"
+            # CONTAINER PRIVATE API ENDPOINT - requires JWT (paged by page number, not offset)
+            page = offset // limit + 1
+            url = f"{self.api_url}/wapi/p/aggregate/batch-history?page={page}&limit={limit}&catalogId={catalog_id}&modelId={model_id}"
             
             container_jwt = get_container_jwt()
             if not container_jwt:
@@ -233,16 +389,9 @@ class AtScaleAPIClient:
                         "offset": 0
                     }
                 }
-            
-            # GET requests shouldn't have Content-Type header
-            headers = {
-                "Authorization": f"Bearer {container_jwt}"
-            }
         
         try:
-            response = requests.get(
-                url, headers=headers, verify=False, timeout=30
-            )
+            response = self._request("GET", url, private=True, timeout=30)
             response.raise_for_status()
         except requests.exceptions.RequestException as e:
             print(f"Request failed with status {e.response.status_code if e.response else 'N/A'}")
@@ -251,114 +400,169 @@ class AtScaleAPIClient:
                 print(f"Response: {e.response.text[:200]}")
             raise
         
-        data = response.json()
-        
-        if self.config.get("instance_type") == "installer":
-            return data
-        else:
-            # Transform container build history response
-            return self._transform_container_build_history(data)
+        return self._transform_build_history(json_loads(response.content))
     
     def _transform_container_build_history(self, container_data: Dict) -> Dict:
         """Transform container build history response"""
         history_data = container_data.get("data", [])
         total = container_data.get("total", 0)
         
-        transformed_history = []
+        # The decoded response is not shared, so batches are annotated in place rather than copied
         for batch in history_data:
-            transformed_batch = dict(batch)
-            transformed_batch["batchId"] = transformed_batch.get("id", "")
-            transformed_history.append(transformed_batch)
+            batch["batchId"] = batch.get("id", "")
         
         return {
             "response": {
-                "data": transformed_history,
+                "data": history_data,
                 "total": total,
                 "limit": container_data.get("limit", 20),
                 "offset": container_data.get("offset", 0)
             }
         }
 
-    # Update other methods to use the new URL building approach
+    def get_aggregates_by_cube_all_pages(self, catalog_id: str, model_id: str, limit: int = 200,
+                                         parallel_pages: bool = True) -> Dict:
+        """Get every aggregate page for a cube/model, fetching pages past the first concurrently unless parallel_pages is False"""
+        return self._fetch_all_pages(
+            lambda offset: self.get_aggregates_by_cube(catalog_id, model_id, limit=limit, offset=offset),
+            limit,
+            parallel_pages=parallel_pages
+        )
+
+    def get_aggregates_by_cube_cached(self, catalog_id: str, model_id: str) -> Dict:
+        """Get all aggregates for a cube/model, reusing a response fetched within AGGREGATES_CACHE_TTL"""
+        key = (catalog_id, model_id)
+        cached = self._cube_aggregates_cache.get(key)
+        now = time.monotonic()
+        if cached and now - cached[0] < AGGREGATES_CACHE_TTL:
+            return cached[1]
+        
+        response = self.get_aggregates_by_cube_all_pages(catalog_id, model_id)
+        self._cube_aggregates_cache[key] = (now, response)
+        return response
+
+    def get_aggregates_by_cubes(self, pairs: List[Tuple[str, str]], max_workers: int = MAX_PAGE_WORKERS) -> List[Dict]:
+        """Get every aggregate for several (catalog_id, model_id) pairs concurrently, in input order
+
+        The concurrency is across cubes; each cube's later pages are fetched in
+        turn, so at most max_workers requests are in flight.
+        """
+        if not pairs:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pairs))) as executor:
+            return list(executor.map(
+                lambda pair: self.get_aggregates_by_cube_all_pages(*pair, parallel_pages=False), pairs
+            ))
+
+    def get_aggregate_build_history_all_pages(self, catalog_id: str, model_id: str, limit: int = 20,
+                                              max_records: Optional[int] = None) -> Dict:
+        """Get build history pages up to max_records, fetching pages past the first concurrently"""
+        return self._fetch_all_pages(
+            lambda offset: self.get_aggregate_build_history(catalog_id, model_id, limit=limit, offset=offset),
+            limit,
+            max_records
+        )
+
+    def _fetch_all_pages(self, fetch_page: Callable[[int], Dict], limit: int,
+                         max_records: Optional[int] = None, parallel_pages: bool = True) -> Dict:
+        """Fetch the first page to learn the total and page size, then the remaining pages (in parallel unless parallel_pages is False)
+
+        Later offsets step by the size of the first page, so a server that caps
+        limit still gets every record. A missing total, or one no larger than
+        the first page, means there are no more pages; only max_records truncates.
+        """
+        first_page = fetch_page(0)
+        response = first_page.get("response") or {}
+        data = list(response.get("data") or [])
+        page_size = len(data)
+        total = response.get("total") or 0
+        wanted = total if max_records is None else min(total, max_records)
+        
+        # Container endpoints that ignore paging return everything in the first response
+        if page_size and wanted > page_size:
+            offsets = range(page_size, wanted, page_size)
+            if parallel_pages:
+                with ThreadPoolExecutor(max_workers=min(MAX_PAGE_WORKERS, len(offsets))) as executor:
+                    # map() yields pages in offset order, so the merged data keeps the API ordering
+                    pages = list(executor.map(fetch_page, offsets))
+            else:
+                # Caller is already one of several concurrent workers; don't nest another pool
+                pages = map(fetch_page, offsets)
+            for page in pages:
+                data.extend((page.get("response") or {}).get("data") or [])
+        
+        if max_records is not None:
+            data = data[:max_records]
+        return {
+            "response": {
+                "data": data,
+                "total": max(total, len(data)),
+                "limit": limit,
+                "offset": 0
+            }
+        }
+
     def get_aggregates(self) -> List[Dict]:
         """Get list of all aggregates - PUBLIC API"""
-        if self.config.get("instance_type") == "installer":
-            org = self.config["organization"]
-            url = self._build_installer_url(10502, f"/aggregates/orgId/{org}")
+        if self.is_installer:
+            url = f"{self.api_url}/aggregates/orgId/{self.org}"
         else:
-            url = f"{self.base_url}/v1/aggregates/instances"
+            url = f"{self.api_url}/v1/aggregates/instances"
         
-        response = requests.get(
-            url, headers=self._get_public_headers(), verify=False, timeout=30
-        )
+        response = self._request("GET", url, timeout=30)
         response.raise_for_status()
-        return response.json()
+        return json_loads(response.content)
 
     def get_aggregate_details(self, aggregate_id: str) -> Dict:
         """Get details of a specific aggregate - PUBLIC API"""
-        if self.config.get("instance_type") == "installer":
-            org = self.config["organization"]
-            url = self._build_installer_url(10502, f"/aggregates/orgId/{org}/{aggregate_id}")
+        if self.is_installer:
+            url = f"{self.api_url}/aggregates/orgId/{self.org}/{aggregate_id}"
         else:
-            url = f"{self.base_url}/v1/aggregates/instances/{aggregate_id}"
+            url = f"{self.api_url}/v1/aggregates/instances/{aggregate_id}"
         
-        response = requests.get(
-            url, headers=self._get_public_headers(), verify=False, timeout=30
-        )
+        response = self._request("GET", url, timeout=30)
         response.raise_for_status()
-        return response.json()
+        return json_loads(response.content)
 
     def create_aggregate(self, aggregate_data: Dict[str, Any]) -> Dict:
         """Create a new aggregate - PUBLIC API"""
-        if self.config.get("instance_type") == "installer":
-            org = self.config["organization"]
-            url = self._build_installer_url(10502, f"/aggregates/orgId/{org}")
+        if self.is_installer:
+            url = f"{self.api_url}/aggregates/orgId/{self.org}"
         else:
-            url = f"{self.base_url}/v1/aggregates/definitions"
+            url = f"{self.api_url}/v1/aggregates/definitions"
         
-        response = requests.post(
-            url, headers=self._get_public_headers(), json=aggregate_data, verify=False, timeout=30
-        )
+        response = self._request("POST", url, json=aggregate_data, timeout=30)
         response.raise_for_status()
-        return response.json()
+        return json_loads(response.content)
 
     def update_aggregate(self, aggregate_id: str, aggregate_data: Dict[str, Any]) -> Dict:
         """Update an existing aggregate - PUBLIC API"""
-        if self.config.get("instance_type") == "installer":
-            org = self.config["organization"]
-            url = self._build_installer_url(10502, f"/aggregates/orgId/{org}/{aggregate_id}")
+        if self.is_installer:
+            url = f"{self.api_url}/aggregates/orgId/{self.org}/{aggregate_id}"
         else:
-            url = f"{self.base_url}/v1/aggregates/definitions/{aggregate_id}"
+            url = f"{self.api_url}/v1/aggregates/definitions/{aggregate_id}"
         
-        response = requests.put(
-            url, headers=self._get_public_headers(), json=aggregate_data, verify=False, timeout=30
-        )
+        response = self._request("PUT", url, json=aggregate_data, timeout=30)
         response.raise_for_status()
-        return response.json()
+        return json_loads(response.content)
 
     def delete_aggregate(self, aggregate_id: str) -> bool:
         """Delete an aggregate - PUBLIC API"""
-        if self.config.get("instance_type") == "installer":
-            org = self.config["organization"]
-            url = self._build_installer_url(10502, f"/aggregates/orgId/{org}/{aggregate_id}")
+        if self.is_installer:
+            url = f"{self.api_url}/aggregates/orgId/{self.org}/{aggregate_id}"
         else:
-            url = f"{self.base_url}/v1/aggregates/definitions/{aggregate_id}"
+            url = f"{self.api_url}/v1/aggregates/definitions/{aggregate_id}"
         
-        response = requests.delete(
-            url, headers=self._get_public_headers(), verify=False, timeout=30
-        )
+        response = self._request("DELETE", url, timeout=30)
         return response.status_code == 200
 
     def refresh_aggregate(self, aggregate_id: str) -> Dict:
         """Refresh/rebuild a specific aggregate - PUBLIC API"""
-        if self.config.get("instance_type") == "installer":
-            org = self.config["organization"]
-            url = self._build_installer_url(10502, f"/aggregates/orgId/{org}/{aggregate_id}/refresh")
+        if self.is_installer:
+            url = f"{self.api_url}/aggregates/orgId/{self.org}/{aggregate_id}/refresh"
         else:
-            url = f"{self.base_url}/v1/aggregates/instances/{aggregate_id}/refresh"
+            url = f"{self.api_url}/v1/aggregates/instances/{aggregate_id}/refresh"
         
-        response = requests.post(
-            url, headers=self._get_public_headers(), verify=False, timeout=30
-        )
+        response = self._request("POST", url, timeout=30)
         response.raise_for_status()
-        return response.json()
\ No newline at end of file
+        return json_loads(response.content)
\ No newline at end of file
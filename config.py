@@ -1,22 +1,56 @@
 # config.py
 import os
 import json
+import base64
+import time
+from functools import lru_cache
 import requests
 import urllib3
 from urllib.parse import urlparse
-from typing import Dict, Tuple, Optional
+from typing import Any, Dict, Tuple, Optional
+
+try:
+    import orjson
+except ImportError:  # optional speedup, stdlib json is used otherwise
+    orjson = None
+
+# JSON decoder shared by every module that parses API responses or config
+json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def dumps_indented(data: Any) -> str:
+    """Pretty-print JSON with 2-space indentation, using orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2, default=str).decode()
+    return json.dumps(data, indent=2, default=str)
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 CONFIG_PATH = os.path.join(os.path.dirname(__file__), "./config.json")
 _JWT_CACHE = None
-_CONTAINER_JWT_CACHE = None
+# (access_token, expires_at epoch seconds) for the container private API
+_CONTAINER_JWT_CACHE: Optional[Tuple[str, float]] = None
+# Bumped whenever the public API token may have changed, so callers can cache derived headers
+_JWT_VERSION = 0
 
+# OIDC tokens are refreshed this many seconds before they expire
+TOKEN_EXPIRY_MARGIN = 30
+# Lifetime assumed when the token endpoint omits expires_in
+DEFAULT_TOKEN_LIFETIME = 300
 
+# Installer JWTs are reused across runs from this file until they are this close to expiring
+JWT_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".atscale", "jwt.json")
+JWT_MIN_REMAINING = 60
+
+# Shared session so token refreshes reuse the connection to the auth endpoint
+_AUTH_SESSION = requests.Session()
+
+
+@lru_cache(maxsize=1)
 def load_config() -> Dict:
-    """Load configuration from config.json"""
-    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    """Load configuration from config.json (parsed once per process, see clear_config_cache)"""
+    with open(CONFIG_PATH, "rb") as f:
+        return json_loads(f.read())
 
 
 def get_credentials() -> Tuple[str, str]:
@@ -44,13 +78,56 @@ def normalize_host(host: str) -> str:
     return f"https://{host}"
 
 
+def _jwt_expiry(token: str) -> Optional[float]:
+    """Return the exp claim (epoch seconds) of a JWT, or None if it has none"""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+def _read_jwt_file(key: str) -> Optional[str]:
+    """Return the persisted token for this host/org/user if it is not about to expire"""
+    try:
+        with open(JWT_CACHE_FILE, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get("key") != key or cached.get("exp", 0) - time.time() <= JWT_MIN_REMAINING:
+        return None
+    return cached.get("token")
+
+
+def write_private_json(path: str, payload: Dict) -> None:
+    """Best-effort write of a JSON file only the owner can read (file 0600, directory 0700)"""
+    try:
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            if hasattr(os, "fchmod"):
+                # An existing file keeps its old mode through O_TRUNC
+                os.fchmod(f.fileno(), 0o600)
+            json.dump(payload, f)
+    except OSError:
+        pass
+
+
+def _write_jwt_file(key: str, token: str) -> None:
+    """Persist a token so later runs can skip authentication"""
+    exp = _jwt_expiry(token)
+    if exp is not None:
+        write_private_json(JWT_CACHE_FILE, {"key": key, "token": token, "exp": exp})
+
+
 def get_jwt(force_refresh: bool = False) -> str:
     """
     Returns authentication token based on instance_type.
     - Installer: JWT via auth endpoint
     - Container: Static token from config (for public API)
     """
-    global _JWT_CACHE
+    global _JWT_CACHE, _JWT_VERSION
     config = load_config()
 
     if config.get("instance_type") == "installer":
@@ -63,17 +140,28 @@ def get_jwt(force_refresh: bool = False) -> str:
         password = config["password"]
         org = config["organization"]
         
+        # A token from an earlier run is tied to the host, organization and user it was issued for
+        cache_key = f"{host}|{org}|{username}"
+        if not force_refresh:
+            token = _read_jwt_file(cache_key)
+            if token:
+                _JWT_CACHE = token
+                _JWT_VERSION += 1
+                return _JWT_CACHE
+        
         # Parse the host URL to extract netloc (hostname:port)
         parsed_url = urlparse(host)
         netloc = parsed_url.netloc
         
         # For installer, we need to use port 10500 for auth
         url = f"{parsed_url.scheme}://{netloc}:10500/{org}/auth"
-        resp = requests.get(
+        resp = _AUTH_SESSION.get(
             url, auth=(username, password), verify=False, timeout=15
         )
         resp.raise_for_status()
         _JWT_CACHE = resp.text.strip()
+        _JWT_VERSION += 1
+        _write_jwt_file(cache_key, _JWT_CACHE)
 
     elif config.get("instance_type") == "container":
         # Container: Return static token for public API
@@ -100,8 +188,8 @@ def get_container_jwt(force_refresh: bool = False) -> Optional[str]:
     if config.get("instance_type") != "container":
         raise ValueError("get_container_jwt() only works for container instances")
     
-    if _CONTAINER_JWT_CACHE and not force_refresh:
-        return _CONTAINER_JWT_CACHE
+    if _CONTAINER_JWT_CACHE and not force_refresh and time.time() < _CONTAINER_JWT_CACHE[1]:
+        return _CONTAINER_JWT_CACHE[0]
     
     # Check if we have OIDC credentials
     client_id = config.get("client_id")
@@ -125,20 +213,40 @@ def get_container_jwt(force_refresh: bool = False) -> Optional[str]:
     }
     
     try:
-        resp = requests.post(url, data=data, verify=False, timeout=15)
+        resp = _AUTH_SESSION.post(url, data=data, verify=False, timeout=15)
         resp.raise_for_status()
-        _CONTAINER_JWT_CACHE = resp.json().get("access_token")
-        return _CONTAINER_JWT_CACHE
+        token_data = json_loads(resp.content)
+        token = token_data.get("access_token")
+        if not token:
+            return None
+        expires_in = token_data.get("expires_in") or DEFAULT_TOKEN_LIFETIME
+        _CONTAINER_JWT_CACHE = (token, time.time() + expires_in - TOKEN_EXPIRY_MARGIN)
+        return token
     except Exception as e:
         print(f"Warning: Failed to get container JWT: {e}")
         return None
 
 
 def clear_jwt_cache() -> None:
-    """Clear cached JWT tokens"""
-    global _JWT_CACHE, _CONTAINER_JWT_CACHE
+    """Clear cached JWT tokens, including the one persisted for later runs"""
+    global _JWT_CACHE, _CONTAINER_JWT_CACHE, _JWT_VERSION
     _JWT_CACHE = None
     _CONTAINER_JWT_CACHE = None
+    _JWT_VERSION += 1
+    try:
+        os.remove(JWT_CACHE_FILE)
+    except OSError:
+        pass
+
+
+def get_jwt_version() -> int:
+    """Return a counter that changes whenever the get_jwt() token may have changed"""
+    return _JWT_VERSION
+
+
+def clear_config_cache() -> None:
+    """Force the next load_config() call to re-read config.json"""
+    load_config.cache_clear()
 
 
 def validate_config() -> Dict:
@@ -1,173 +1,231 @@
 # cube_aggregate_reporter.py
 import csv
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+from aggregate_view import EMPTY, AggregateView
+from api_client import POOL_MAXSIZE
+from time_format import format_ms
 from ui_components import display_table
 
+# Characters dropped from cube names when building export filenames (keeps letters, digits, space, '-' and '_')
+_UNSAFE_FILENAME_RE = re.compile(r'[^\w \-]')
+
+# CSV export columns
+CSV_FIELDNAMES = list(AggregateView._fields)
+
+# Cubes exported at once by report_all_cubes unless ATSCALE_PARALLEL says otherwise
+DEFAULT_EXPORT_WORKERS = 4
+
+
+def _export_workers() -> int:
+    """Read ATSCALE_PARALLEL, falling back to the default when unset or not a number, clamped to the connection pool"""
+    try:
+        workers = int(os.getenv("ATSCALE_PARALLEL", DEFAULT_EXPORT_WORKERS))
+    except ValueError:
+        workers = DEFAULT_EXPORT_WORKERS
+    return max(1, min(workers, POOL_MAXSIZE))
+
 
 class CubeAggregateReporter:
+    """Lists and exports a cube's aggregates
+
+    Methods raise whatever stops them (request, decode or file errors) and
+    print nothing about the failure; callers report it, and callers working
+    through several cubes catch Exception per cube.
+    """
+    
     def __init__(self, api_client):
         self.api_client = api_client
     
     def list_cube_aggregates(self, cube_data: Dict) -> None:
         """List aggregates for a specific cube"""
-        try:
-            print("\nFetching aggregates for cube...")
-            response = self.api_client.get_aggregates_by_cube(
-                cube_data["project_id"], 
-                cube_data["cube_id"]
-            )
-            
-            aggregates_data = response.get("response", {}).get("data", [])
-            
-            if not aggregates_data:
-                print(f"No aggregates found for {cube_data['display']}.")
-                return
-            
-            total_aggregates = response.get("response", {}).get("total", 0)
-            print(f"\nFound {len(aggregates_data)} aggregates (Total: {total_aggregates})")
-            
-            # Display in table format
-            columns = ["ID (short)", "Name", "Type", "Status", "Rows", "Build Time", "Last Query"]
-            display_data = []
-            
-            for agg in aggregates_data:
-                agg_id = agg.get("id", "N/A")
-                latest_instance = agg.get("latest_instance", {})
-                stats = latest_instance.get("stats", {})
-                agg_stats = agg.get("stats", {})
-                
-                # Calculate build time
-                build_duration = stats.get("build_duration", 0)
-                build_time_str = f"{build_duration}ms"
-                if build_duration > 1000:
-                    build_time_str = f"{build_duration/1000:.1f}s"
-                
-                # Format last query time
-                last_query = agg_stats.get("most_recent_query", "Never")
-                if last_query != "Never":
-                    try:
-                        query_date = datetime.fromisoformat(last_query.replace('Z', '+00:00'))
-                        last_query = query_date.strftime("%Y-%m-%d %H:%M")
-                    except:
-                        pass
-                
-                display_data.append({
-                    "ID (short)": agg_id[:12] + "...",
-                    "Name": agg.get("name", "Unnamed")[:30],
-                    "Type": agg.get("type", "unknown"),
-                    "Status": latest_instance.get("status", "unknown"),
-                    "Rows": stats.get("number_of_rows", 0),
-                    "Build Time": build_time_str,
-                    "Last Query": last_query[:15] + "..." if len(last_query) > 15 else last_query
-                })
+        print("\nFetching aggregates for cube...")
+        response = self.api_client.get_aggregates_by_cube(
+            cube_data["project_id"], 
+            cube_data["cube_id"]
+        )
+        
+        aggregates_data = response.get("response", {}).get("data", [])
+        
+        if not aggregates_data:
+            print(f"No aggregates found for {cube_data['display']}.")
+            return
+        
+        total_aggregates = response.get("response", {}).get("total", 0)
+        print(f"\nFound {len(aggregates_data)} aggregates (Total: {total_aggregates})")
+        
+        # Display in table format
+        columns = ["ID (short)", "Name", "Type", "Status", "Rows", "Build Time", "Last Query"]
+        display_data = []
+        
+        for agg in aggregates_data:
+            agg_id = agg.get("id", "N/A")
+            latest_instance = agg.get("latest_instance") or EMPTY
+            stats = latest_instance.get("stats") or EMPTY
+            agg_stats = agg.get("stats") or EMPTY
             
-            display_table(display_data, columns)
+            # Calculate build time
+            build_duration = stats.get("build_duration", 0)
+            build_time_str = f"{build_duration}ms"
+            if build_duration > 1000:
+                build_time_str = f"{build_duration/1000:.1f}s"
             
-            # Show summary
-            self._print_cube_summary(aggregates_data, cube_data["display"])
+            # Format last query time
+            last_query = agg_stats.get("most_recent_query", "Never")
+            if last_query and last_query != "Never":
+                # Only the wall-clock fields are shown, so the UTC designator can simply be dropped
+                iso = last_query[:-1] if last_query.endswith('Z') else last_query
+                try:
+                    last_query = datetime.fromisoformat(iso).strftime("%Y-%m-%d %H:%M")
+                except ValueError:
+                    pass
             
-        except Exception as e:
-            print(f"Error: {e}")
+            display_data.append({
+                "ID (short)": f"{agg_id[:12]}..." if len(agg_id) > 12 else agg_id,
+                "Name": agg.get("name", "Unnamed")[:30],
+                "Type": agg.get("type", "unknown"),
+                "Status": latest_instance.get("status", "unknown"),
+                "Rows": stats.get("number_of_rows", 0),
+                "Build Time": build_time_str,
+                "Last Query": last_query[:15] + "..." if len(last_query) > 15 else last_query
+            })
+        
+        display_table(display_data, columns)
+        
+        # Show summary
+        self._print_cube_summary(aggregates_data, cube_data["display"])
     
     def export_cube_aggregates_csv(self, cube_data: Dict) -> None:
         """Export cube aggregates to CSV file"""
+        print("\nFetching aggregates for cube...")
+        filename, total = self._write_cube_csv(cube_data)
+        self._print_export_result(cube_data, filename, total)
+    
+    def _write_cube_csv(self, cube_data: Dict) -> Tuple[Optional[str], int]:
+        """Write a cube's aggregates to a new CSV without printing; returns (filename, total), filename None if there were none"""
+        # Cube name for readability, cube ID so different cubes never share a file
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        safe_cube_name = _UNSAFE_FILENAME_RE.sub('', cube_data['display']).rstrip()
+        safe_cube_id = _UNSAFE_FILENAME_RE.sub('', cube_data['cube_id'])
+        filename = f"aggregates_{safe_cube_name}_{safe_cube_id}_{timestamp}.csv"
+        
+        total = 0
+        # Opened outside the try: if open() itself fails there is nothing to clean up
+        csvfile = open(filename, 'w', newline='', encoding='utf-8')
         try:
-            print("\nFetching aggregates for cube...")
-            response = self.api_client.get_aggregates_by_cube(
-                cube_data["project_id"], 
-                cube_data["cube_id"]
-            )
-            
-            aggregates_data = response.get("response", {}).get("data", [])
-            
-            if not aggregates_data:
-                print(f"No aggregates found for {cube_data['display']}.")
-                return
-            
-            # Create filename with timestamp and cube name
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            safe_cube_name = "".join(c for c in cube_data['display'] if c.isalnum() or c in (' ', '-', '_')).rstrip()
-            filename = f"aggregates_{safe_cube_name}_{timestamp}.csv"
-            
-            # Define CSV columns
-            fieldnames = [
-                "aggregate_id", "aggregate_name", "type", "subtype", 
-                "status", "rows", "build_duration_ms", "avg_build_duration_ms",
-                "query_utilization", "last_query_time", "created_at",
-                "table_name", "table_schema", "batch_id", "connection_id",
-                "key_count", "measure_count", "dimension_count", "total_attributes"
-            ]
-            
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
+            # Rows are written as aggregates stream in, so the full listing is never held in memory
+            with csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(CSV_FIELDNAMES)
                 
-                for agg in aggregates_data:
-                    latest_instance = agg.get("latest_instance", {})
-                    instance_stats = latest_instance.get("stats", {})
-                    agg_stats = agg.get("stats", {})
-                    
-                    # Count attribute types
-                    attributes = agg.get("attributes", [])
-                    key_count = sum(1 for a in attributes if a.get("type") == "key")
-                    measure_count = sum(1 for a in attributes if a.get("type") == "measure")
-                    dimension_count = sum(1 for a in attributes if a.get("type") == "dimension")
-                    
-                    row = {
-                        "aggregate_id": agg.get("id", ""),
-                        "aggregate_name": agg.get("name", ""),
-                        "type": agg.get("type", ""),
-                        "subtype": agg.get("subtype", ""),
-                        "status": latest_instance.get("status", ""),
-                        "rows": instance_stats.get("number_of_rows", 0),
-                        "build_duration_ms": instance_stats.get("build_duration", 0),
-                        "avg_build_duration_ms": agg_stats.get("average_build_duration", 0),
-                        "query_utilization": agg_stats.get("query_utilization", 0),
-                        "last_query_time": agg_stats.get("most_recent_query", ""),
-                        "created_at": agg_stats.get("created_at", ""),
-                        "table_name": latest_instance.get("table_name", ""),
-                        "table_schema": latest_instance.get("table_schema", ""),
-                        "batch_id": latest_instance.get("batch_id", ""),
-                        "connection_id": latest_instance.get("connection_id", ""),
-                        "key_count": key_count,
-                        "measure_count": measure_count,
-                        "dimension_count": dimension_count,
-                        "total_attributes": len(attributes)
-                    }
-                    writer.writerow(row)
-            
-            print(f"\n✓ Report exported successfully: {filename}")
-            print(f"Total aggregates: {len(aggregates_data)}")
-            print(f"File size: {os.path.getsize(filename):,} bytes")
+                for view in self.api_client.iter_aggregate_views(cube_data["project_id"], cube_data["cube_id"]):
+                    writer.writerow(view)
+                    total += 1
+        except Exception:
+            # Don't leave a truncated report behind
+            os.remove(filename)
+            raise
+        
+        if not total:
+            os.remove(filename)
+            return None, 0
+        return filename, total
+    
+    def _print_export_result(self, cube_data: Dict, filename: Optional[str], total: int) -> None:
+        """Print the outcome of one cube's CSV export"""
+        if filename is None:
+            print(f"No aggregates found for {cube_data['display']}.")
+            return
+        
+        print(f"\n✓ Report exported successfully: {filename}")
+        print(f"Total aggregates: {total}")
+        print(f"File size: {os.path.getsize(filename):,} bytes")
+    
+    def export_all_cubes_csv(self, cubes: List[Dict]) -> None:
+        """Export aggregates for several cubes into one CSV file, fetching cubes concurrently"""
+        print(f"\nFetching aggregates for {len(cubes)} cubes...")
+        responses = self.api_client.get_aggregates_by_cubes(
+            [(cube_data["project_id"], cube_data["cube_id"]) for cube_data in cubes]
+        )
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"aggregates_all_cubes_{timestamp}.csv"
+        total = 0
+        
+        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(["project_name", "cube_name"] + CSV_FIELDNAMES)
             
-        except Exception as e:
-            print(f"Error exporting to CSV: {e}")
+            for cube_data, response in zip(cubes, responses):
+                cube_columns = (cube_data["project_name"], cube_data["cube_name"])
+                for agg in response.get("response", {}).get("data", []):
+                    writer.writerow(cube_columns + AggregateView.from_installer(agg))
+                    total += 1
+        
+        print(f"\n✓ Report exported successfully: {filename}")
+        print(f"Total aggregates: {total}")
+        print(f"File size: {os.path.getsize(filename):,} bytes")
+    
+    def report_all_cubes(self, cubes: List[Dict]) -> List[str]:
+        """Export a CSV per cube, ATSCALE_PARALLEL (default 4) at a time, continuing past cubes that fail; returns the failed cube IDs
+
+        Workers only fetch and write; every result is printed from this thread
+        once all exports have finished, in input order.
+        """
+        # A cube listed twice would otherwise be written to the same file by two workers at once
+        unique_cubes: Dict[Tuple[str, str], Dict] = {}
+        for cube_data in cubes:
+            unique_cubes.setdefault((cube_data["project_id"], cube_data["cube_id"]), cube_data)
+        cubes = list(unique_cubes.values())
+        if not cubes:
+            return []
+        
+        def export(cube_data: Dict) -> Tuple[Optional[str], int, Optional[Exception]]:
+            try:
+                filename, total = self._write_cube_csv(cube_data)
+                return filename, total, None
+            except Exception as e:
+                return None, 0, e
+        
+        print(f"\nFetching aggregates for {len(cubes)} cube(s)...")
+        with ThreadPoolExecutor(max_workers=min(_export_workers(), len(cubes))) as executor:
+            results = list(executor.map(export, cubes))
+        
+        failed = []
+        for cube_data, (filename, total, error) in zip(cubes, results):
+            if error is not None:
+                print(f"\nError exporting cube {cube_data['cube_id']}: {error}")
+                failed.append(cube_data["cube_id"])
+            else:
+                self._print_export_result(cube_data, filename, total)
+        
+        if failed:
+            print(f"\n{len(failed)} of {len(cubes)} cube(s) failed: {', '.join(failed)}")
+        return failed
     
     def _print_cube_summary(self, aggregates: List[Dict], cube_name: str) -> None:
         """Print summary of cube aggregates"""
-        total_rows = sum(agg.get("latest_instance", {}).get("stats", {}).get("number_of_rows", 0) for agg in aggregates)
-        total_build_time = sum(agg.get("latest_instance", {}).get("stats", {}).get("build_duration", 0) for agg in aggregates)
-        active_count = sum(1 for agg in aggregates if agg.get("latest_instance", {}).get("status", "").lower() == "active")
+        total_rows = total_build_time = active_count = 0
+        for agg in aggregates:
+            latest_instance = agg.get("latest_instance") or EMPTY
+            stats = latest_instance.get("stats") or EMPTY
+            total_rows += stats.get("number_of_rows", 0)
+            total_build_time += stats.get("build_duration", 0)
+            status = latest_instance.get("status", "")
+            # Statuses are normally already lowercase, so skip .lower() for the common case
+            if status == "active" or status.lower() == "active":
+                active_count += 1
         
         print(f"\nSummary for {cube_name}:")
         print(f"  Total aggregates:    {len(aggregates)}")
         print(f"  Active aggregates:   {active_count}")
         print(f"  Total rows:          {total_rows:,}")
-        print(f"  Total build time:    {self._format_time(total_build_time)}")
+        print(f"  Total build time:    {format_ms(total_build_time)}")
         if aggregates:
             avg_rows = total_rows / len(aggregates)
             avg_build = total_build_time / len(aggregates)
             print(f"  Average rows:        {avg_rows:,.0f}")
-            print(f"  Average build time:  {self._format_time(avg_build)}")
-    
-    def _format_time(self, milliseconds: int) -> str:
-        """Format time in milliseconds to human readable format"""
-        if milliseconds < 1000:
-            return f"{milliseconds:.0f}ms"
-        elif milliseconds < 60000:
-            return f"{milliseconds/1000:.1f}s"
-        else:
-            minutes = milliseconds / 60000
-            return f"{minutes:.1f}min"
\ No newline at end of file
+            print(f"  Average build time:  {format_ms(avg_build)}")
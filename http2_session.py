@@ -0,0 +1,112 @@
+# http2_session.py
+from typing import Any, Dict, Iterator, Mapping, Optional
+import requests
+
+try:
+    import httpx
+    import h2  # noqa: F401  (httpx needs it for http2=True)
+except ImportError:  # optional; the client stays on requests/HTTP/1.1 without it
+    httpx = None
+
+# Connection-level retries for the HTTP/2 transport (httpx does not retry on status codes)
+HTTP2_CONNECT_RETRIES = 3
+
+
+def http2_available() -> bool:
+    """Return True when httpx with HTTP/2 support is installed"""
+    return httpx is not None
+
+
+class _StreamReader:
+    """Minimal file-like reader over a decoded byte iterator, as consumed by ijson"""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._buffer = b""
+        # Accepted for parity with urllib3's raw stream; httpx always yields decoded bytes
+        self.decode_content = True
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to size bytes (all remaining bytes when size < 0)"""
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class Http2Response:
+    """The subset of requests.Response used by AtScaleAPIClient, backed by an httpx response"""
+
+    def __init__(self, response: "httpx.Response"):
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.url = str(response.url)
+        self._raw: Optional[_StreamReader] = None
+
+    @property
+    def content(self) -> bytes:
+        return self._response.read()
+
+    @property
+    def text(self) -> str:
+        self._response.read()
+        return self._response.text
+
+    @property
+    def raw(self) -> _StreamReader:
+        if self._raw is None:
+            self._raw = _StreamReader(self._response.iter_bytes())
+        return self._raw
+
+    def raise_for_status(self) -> None:
+        """Raise requests.HTTPError for 4xx/5xx so callers handle both transports alike"""
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(
+                f"{self.status_code} Error: {self._response.reason_phrase} for url: {self.url}", response=self
+            )
+
+    def close(self) -> None:
+        self._response.close()
+
+    def __enter__(self) -> "Http2Response":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class Http2Session:
+    """requests.Session-compatible subset that multiplexes requests over HTTP/2 via httpx"""
+
+    def __init__(self, max_connections: int, max_keepalive_connections: int):
+        # Default headers merged under per-call headers, like requests.Session.headers
+        self.headers: Dict[str, str] = {}
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections)
+        transport = httpx.HTTPTransport(http2=True, verify=False, limits=limits, retries=HTTP2_CONNECT_RETRIES)
+        self._client = httpx.Client(transport=transport, verify=False)
+
+    def request(self, method: str, url: str, headers: Optional[Mapping[str, str]] = None,
+                verify: bool = False, stream: bool = False, timeout: Optional[float] = None,
+                json: Any = None) -> Http2Response:
+        """Send a request; verify is ignored because the transport is created with verify=False"""
+        request = self._client.build_request(
+            method, url, headers={**self.headers, **(headers or {})}, json=json, timeout=timeout
+        )
+        try:
+            response = self._client.send(request, stream=stream)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        return Http2Response(response)
+
+    def close(self) -> None:
+        """Close the underlying HTTP/2 connections"""
+        self._client.close()
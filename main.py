@@ -1,9 +1,16 @@
 # main.py (updated for command line arguments)
+import csv
+import json
+import re
 import sys
 import argparse
-from rebuild_manager import RebuildManager
-from report_generator import ReportGenerator
-from config import get_jwt, clear_jwt_cache
+from typing import Dict, List, Optional, Tuple
+
+# requests, config and the API/manager modules are imported inside the functions
+# that use them, so --help and argument errors return without loading them
+
+# Project/catalog and cube/model IDs are UUIDs; checked before any request is made
+_UUID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I)
 
 
 def parse_arguments():
@@ -12,21 +19,50 @@ def parse_arguments():
     
     parser.add_argument(
         '--project-id', 
-        help='Project/Catalog ID (required for direct export)'
+        nargs='+',
+        help='Project/Catalog ID(s) (required for direct export); one ID applies to every --cube-id'
     )
     parser.add_argument(
         '--cube-id', 
-        help='Cube/Model ID (required for direct export)'
+        nargs='+',
+        help='Cube/Model ID(s) (required for direct export)'
+    )
+    parser.add_argument(
+        '--manifest',
+        help='JSON list of {"project_id", "cube_id"} objects, or CSV with those columns, for batch runs'
+    )
+    parser.add_argument(
+        '--all-cubes',
+        action='store_true',
+        help='Select every cube of every published project instead of --project-id/--cube-id or --manifest'
+    )
+    parser.add_argument(
+        '--project-name',
+        help='Project display name for a single cube; with --cube-name, skips the projects lookup'
+    )
+    parser.add_argument(
+        '--cube-name',
+        help='Cube display name for a single cube; with --project-name, skips the projects lookup'
+    )
+    parser.add_argument(
+        '--skip-name-lookup',
+        action='store_true',
+        help='Use the IDs as display names instead of fetching the projects list'
     )
     parser.add_argument(
         '--export-csv', 
         action='store_true',
-        help='Export aggregates to CSV directly (requires --project-id and --cube-id)'
+        help='Export aggregates to CSV directly (requires --project-id and --cube-id, or --manifest)'
+    )
+    parser.add_argument(
+        '--combined',
+        action='store_true',
+        help='With --export-csv, write all cubes into one CSV with project_name and cube_name columns'
     )
     parser.add_argument(
         '--list-aggregates', 
         action='store_true',
-        help='List aggregates with details directly (requires --project-id and --cube-id)'
+        help='List aggregates with details directly (requires --project-id and --cube-id, or --manifest)'
     )
     parser.add_argument(
         '--list-projects', 
@@ -37,121 +73,167 @@ def parse_arguments():
     return parser.parse_args()
 
 
-def direct_export_csv(project_id: str, cube_id: str) -> None:
-    """Export aggregates to CSV directly without menu interaction"""
-    report_generator = ReportGenerator()
+def load_manifest(path: str) -> List[Tuple[str, str]]:
+    """Read (project_id, cube_id) pairs from a JSON or CSV manifest"""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = json.load(f)
+    return [(row["project_id"], row["cube_id"]) for row in rows]
+
+
+def get_cube_pairs(args) -> List[Tuple[str, str]]:
+    """Collect the (project_id, cube_id) pairs requested on the command line"""
+    pairs = load_manifest(args.manifest) if args.manifest else []
+    project_ids = args.project_id or []
+    cube_ids = args.cube_id or []
     
-    try:
-        print(f"\nDirect CSV export for project: {project_id}, cube: {cube_id}")
+    if project_ids or cube_ids:
+        if not project_ids or not cube_ids:
+            raise ValueError("--project-id and --cube-id must be given together")
+        if len(project_ids) == 1:
+            project_ids = project_ids * len(cube_ids)
+        elif len(project_ids) != len(cube_ids):
+            raise ValueError("give one --project-id, or one per --cube-id")
+        pairs.extend(zip(project_ids, cube_ids))
+    
+    for pair in pairs:
+        for value in pair:
+            if not _UUID_RE.match(value):
+                raise ValueError(f"{value!r} is not a valid project/cube ID (expected a UUID)")
+    return pairs
+
+
+def resolve_cubes(api_client, cube_pairs: List[Tuple[str, str]],
+                  names: Optional[Tuple[str, str]] = None, skip_name_lookup: bool = False,
+                  all_cubes: bool = False) -> List[Dict]:
+    """Look up cube_data for every pair with a single projects fetch
+
+    names gives (project_name, cube_name) for a single cube. With names or
+    skip_name_lookup the projects list is not fetched and IDs stand in for
+    missing names. With all_cubes every published cube is selected and
+    cube_pairs is ignored.
+    """
+    from projects_util import get_cube_index, get_projects, iter_cube_options, make_cube_data
+    if all_cubes:
         print("Fetching project information...")
-        
-        # First, try to get project name from the API
-        projects = report_generator.api_client.get_published_projects()
-        
-        project_name = "Unknown Project"
-        cube_name = "Unknown Cube"
-        
-        for project in projects:
-            if project.get("id") == project_id:
-                project_name = project.get("name", "Unknown Project")
-                for cube in project.get("cubes", []):
-                    if cube.get("id") == cube_id:
-                        cube_name = cube.get("name", "Unknown Cube")
-                        break
-                break
-        
-        cube_data = {
-            "display": f"{project_name}::{cube_name}",
-            "project_name": project_name,
-            "project_id": project_id,
-            "cube_name": cube_name,
-            "cube_id": cube_id
-        }
-        
+        return list(iter_cube_options(get_projects(api_client)))
+    
+    if names or skip_name_lookup:
+        project_name, cube_name = names or (None, None)
+        return [
+            make_cube_data(project_id, project_name or project_id, cube_id, cube_name or cube_id)
+            for project_id, cube_id in cube_pairs
+        ]
+    
+    print("Fetching project information...")
+    cube_index = get_cube_index(api_client)
+    cubes = []
+    for project_id, cube_id in cube_pairs:
+        cube_data = cube_index.get((project_id, cube_id))
+        if cube_data is None:
+            raise ValueError(f"cube {cube_id} not found in published project {project_id}")
         print(f"Found: {cube_data['display']}")
-        print("Exporting to CSV...")
-        
-        # Call the export function directly
-        report_generator.aggregate_reporter.export_cube_aggregates_csv(cube_data)
+        cubes.append(cube_data)
+    return cubes
+
+
+def direct_export_csv(cube_pairs: List[Tuple[str, str]], names: Optional[Tuple[str, str]] = None,
+                      skip_name_lookup: bool = False, combined: bool = False, all_cubes: bool = False) -> None:
+    """Export aggregates to CSV directly without menu interaction
+
+    With combined, all cubes go into one CSV and any failure fails the export.
+    """
+    from api_client import AtScaleAPIClient
+    from report_generator import ReportGenerator
+    
+    try:
+        with AtScaleAPIClient() as api_client:
+            report_generator = ReportGenerator(api_client)
+            cubes = resolve_cubes(api_client, cube_pairs, names, skip_name_lookup, all_cubes)
+            print(f"\nDirect CSV export for {len(cubes)} cube(s)")
+            
+            print("Exporting to CSV...")
+            if combined:
+                report_generator.aggregate_reporter.export_all_cubes_csv(cubes)
+                failed = []
+            else:
+                # Each cube is exported even if an earlier one fails
+                failed = report_generator.aggregate_reporter.report_all_cubes(cubes)
         
     except Exception as e:
         print(f"Error during direct export: {e}")
         sys.exit(1)
+    
+    if failed:
+        sys.exit(1)
 
 
-def direct_list_aggregates(project_id: str, cube_id: str) -> None:
+def direct_list_aggregates(cube_pairs: List[Tuple[str, str]], names: Optional[Tuple[str, str]] = None,
+                           skip_name_lookup: bool = False, all_cubes: bool = False) -> None:
     """List aggregates directly without menu interaction"""
-    report_generator = ReportGenerator()
+    from api_client import AtScaleAPIClient
+    from report_generator import ReportGenerator
+    failed = []
     
     try:
-        print(f"\nDirect list aggregates for project: {project_id}, cube: {cube_id}")
-        print("Fetching project information...")
-        
-        projects = report_generator.api_client.get_published_projects()
-        
-        project_name = "Unknown Project"
-        cube_name = "Unknown Cube"
-        
-        for project in projects:
-            if project.get("id") == project_id:
-                project_name = project.get("name", "Unknown Project")
-                for cube in project.get("cubes", []):
-                    if cube.get("id") == cube_id:
-                        cube_name = cube.get("name", "Unknown Cube")
-                        break
-                break
-        
-        cube_data = {
-            "display": f"{project_name}::{cube_name}",
-            "project_name": project_name,
-            "project_id": project_id,
-            "cube_name": cube_name,
-            "cube_id": cube_id
-        }
-        
-        print(f"Found: {cube_data['display']}")
-        print("Fetching aggregates...")
-        
-        # Call the list function directly
-        report_generator.aggregate_reporter.list_cube_aggregates(cube_data)
+        with AtScaleAPIClient() as api_client:
+            report_generator = ReportGenerator(api_client)
+            cubes = resolve_cubes(api_client, cube_pairs, names, skip_name_lookup, all_cubes)
+            print(f"\nDirect list aggregates for {len(cubes)} cube(s)")
+            
+            print("Fetching aggregates...")
+            for cube_data in cubes:
+                try:
+                    report_generator.aggregate_reporter.list_cube_aggregates(cube_data)
+                except Exception as e:
+                    print(f"Error listing cube {cube_data['cube_id']}: {e}")
+                    failed.append(cube_data["cube_id"])
         
     except Exception as e:
         print(f"Error during direct list: {e}")
         sys.exit(1)
+    
+    if failed:
+        sys.exit(1)
 
 
 def list_all_projects() -> None:
     """List all published projects/catalogs and their cubes/models"""
-    report_generator = ReportGenerator()
+    from api_client import AtScaleAPIClient
+    from projects_util import get_projects
     
     try:
         print("\nFetching all published projects/catalogs...")
-        projects = report_generator.api_client.get_published_projects()
+        with AtScaleAPIClient() as api_client:
+            projects = get_projects(api_client)
         
         if not projects:
             print("No published projects found.")
             return
         
-        print(f"\nFound {len(projects)} project(s):")
-        print("=" * 80)
+        # Collected and written in one go; large catalogs otherwise pay a print() per cube
+        out = [f"\nFound {len(projects)} project(s):", "=" * 80]
         
         for i, project in enumerate(projects, 1):
             project_id = project.get("id", "N/A")
             project_name = project.get("name", "Unknown Project")
             cubes = project.get("cubes", [])
             
-            print(f"\n{i}. {project_name}")
-            print(f"   ID: {project_id}")
-            print(f"   Cubes/Models: {len(cubes)}")
+            out.append(f"\n{i}. {project_name}")
+            out.append(f"   ID: {project_id}")
+            out.append(f"   Cubes/Models: {len(cubes)}")
             
             for j, cube in enumerate(cubes, 1):
                 cube_id = cube.get("id", "N/A")
                 cube_name = cube.get("name", "Unknown Cube")
-                print(f"   {j}. {cube_name} (ID: {cube_id})")
+                out.append(f"   {j}. {cube_name} (ID: {cube_id})")
         
-        print("\n" + "=" * 80)
-        print("To export directly, use:")
-        print(f"  python main.py --project-id PROJECT_ID --cube-id CUBE_ID --export-csv")
+        out.append("\n" + "=" * 80)
+        out.append("To export directly, use:")
+        out.append("  python main.py --project-id PROJECT_ID --cube-id CUBE_ID --export-csv")
+        sys.stdout.write("\n".join(out) + "\n")
         
     except Exception as e:
         print(f"Error listing projects: {e}")
@@ -160,40 +242,52 @@ def list_all_projects() -> None:
 
 def main_menu() -> None:
     """Display main menu with simplified options"""
-    rebuild_manager = RebuildManager()
-    report_generator = ReportGenerator()
-
-    while True:
-        print("\n" + "="*50)
-        print("ATSCALE AGGREGATE MANAGEMENT")
-        print("="*50)
-        print("1. Refresh Token")
-        print("2. Aggregate Rebuild")
-        print("3. Aggregate Report")
-        print("4. Exit")
-        print("-"*50)
-
-        choice = input("\nSelect option (1-4): ").strip()
-
-        if choice == "1":
-            refresh_token_action()
-        elif choice == "2":
-            rebuild_manager.rebuild_cube()
-        elif choice == "3":
-            report_generator.generate_report()
-        elif choice == "4":
-            print("\nExiting...")
-            break
-        elif choice.lower() == "q":
-            print("\nExiting...")
-            break
-        else:
-            print("Invalid choice. Please select 1-4.")
+    from api_client import AtScaleAPIClient
+    from rebuild_manager import RebuildManager
+    from report_generator import ReportGenerator
+    # One client (and connection pool) serves both the rebuild and report flows; closed on exit
+    with AtScaleAPIClient() as api_client:
+        rebuild_manager = RebuildManager(api_client)
+        report_generator = ReportGenerator(api_client)
+
+        while True:
+            print("\n" + "="*50)
+            print("ATSCALE AGGREGATE MANAGEMENT")
+            print("="*50)
+            print("1. Refresh Token")
+            print("2. Aggregate Rebuild")
+            print("3. Aggregate Report")
+            print("4. Exit")
+            print("-"*50)
+
+            choice = input("\nSelect option (1-4): ").strip()
+
+            if choice == "1":
+                # Also clears the projects cache, so newly published catalogs show up
+                refresh_token_action()
+            elif choice == "2":
+                rebuild_manager.rebuild_cube()
+            elif choice == "3":
+                report_generator.generate_report()
+            elif choice == "4":
+                print("\nExiting...")
+                break
+            elif choice.lower() == "q":
+                print("\nExiting...")
+                break
+            else:
+                print("Invalid choice. Please select 1-4.")
 
 
 def refresh_token_action() -> None:
     """Refresh JWT token"""
+    from config import get_jwt, clear_jwt_cache, clear_config_cache
+    from projects_util import clear_projects_cache
+    # Re-read config.json too, so edited credentials take effect
+    clear_config_cache()
     clear_jwt_cache()
+    # Project listings are cached per instance and may be stale after switching credentials
+    clear_projects_cache()
     try:
         token = get_jwt(force_refresh=True)
         print("\n✓ Token refreshed successfully")
@@ -210,26 +304,42 @@ if __name__ == "__main__":
         list_all_projects()
         sys.exit(0)
     
-    elif args.export_csv:
-        if not args.project_id or not args.cube_id:
-            print("ERROR: --export-csv requires both --project-id and --cube-id")
-            print("\nUsage examples:")
-            print("  python main.py --export-csv --project-id 39e90725-98d4-5a17-aedd-02568e197062 --cube-id e20faf8b-9939-5fb2-96ee-07cfec79dc35")
-            print("\nTo see available projects and cubes:")
-            print("  python main.py --list-projects")
+    elif args.export_csv or args.list_aggregates:
+        option = "--export-csv" if args.export_csv else "--list-aggregates"
+        try:
+            cube_pairs = get_cube_pairs(args)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"ERROR: invalid cube selection: {e}")
             sys.exit(1)
-        direct_export_csv(args.project_id, args.cube_id)
-        sys.exit(0)
-    
-    elif args.list_aggregates:
-        if not args.project_id or not args.cube_id:
-            print("ERROR: --list-aggregates requires both --project-id and --cube-id")
+        if args.all_cubes and (cube_pairs or args.project_name or args.cube_name or args.skip_name_lookup):
+            print("ERROR: --all-cubes replaces the cube selection and name options")
+            sys.exit(1)
+        if not cube_pairs and not args.all_cubes:
+            print(f"ERROR: {option} requires both --project-id and --cube-id, --manifest, or --all-cubes")
             print("\nUsage examples:")
-            print("  python main.py --list-aggregates --project-id 39e90725-98d4-5a17-aedd-02568e197062 --cube-id e20faf8b-9939-5fb2-96ee-07cfec79dc35")
+            print(f"  python main.py {option} --project-id 39e90725-98d4-5a17-aedd-02568e197062 --cube-id e20faf8b-9939-5fb2-96ee-07cfec79dc35")
+            print(f"  python main.py {option} --project-id 39e90725-98d4-5a17-aedd-02568e197062 --cube-id CUBE_ID_1 CUBE_ID_2")
+            print(f"  python main.py {option} --manifest cubes.json")
+            print(f"  python main.py {option} --all-cubes")
             print("\nTo see available projects and cubes:")
             print("  python main.py --list-projects")
             sys.exit(1)
-        direct_list_aggregates(args.project_id, args.cube_id)
+        
+        names = None
+        if args.project_name or args.cube_name:
+            if not (args.project_name and args.cube_name) or len(cube_pairs) != 1:
+                print("ERROR: --project-name and --cube-name go together and apply to a single cube")
+                sys.exit(1)
+            names = (args.project_name, args.cube_name)
+        
+        if args.combined and not args.export_csv:
+            print("ERROR: --combined only applies to --export-csv")
+            sys.exit(1)
+        
+        if args.export_csv:
+            direct_export_csv(cube_pairs, names, args.skip_name_lookup, args.combined, args.all_cubes)
+        else:
+            direct_list_aggregates(cube_pairs, names, args.skip_name_lookup, args.all_cubes)
         sys.exit(0)
     
     # If no command line arguments, run the interactive menu
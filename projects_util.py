@@ -0,0 +1,121 @@
+# projects_util.py
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Iterator, List, Tuple
+from config import write_private_json
+
+# Seconds a published-projects listing stays valid, in memory and on disk (the only projects cache)
+PROJECTS_TTL_SECONDS = int(os.environ.get("ATSCALE_PROJECTS_TTL", "300"))
+
+# Shared with later CLI runs, so --list-projects followed by --export-csv fetches once
+PROJECTS_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".atscale_cache")
+PROJECTS_CACHE_FILE = os.path.join(PROJECTS_CACHE_DIR, "projects.json")
+
+# cache key -> (fetched_at epoch seconds, projects)
+_PROJECTS_CACHE: Dict[str, Tuple[float, List[Dict]]] = {}
+# cache key -> (fetched_at of the projects it was built from, cube index)
+_CUBE_INDEX_CACHE: Dict[str, Tuple[float, Dict[Tuple[str, str], Dict]]] = {}
+
+
+def _cache_key(api_client) -> str:
+    """Identify the AtScale instance, organization and caller a listing belongs to
+
+    Published projects depend on the caller's permissions, so the user is part
+    of the key: the username for installer instances, a token fingerprint for
+    container instances (the token itself is never written to disk).
+    """
+    config = api_client.config
+    caller = config.get("username") or hashlib.sha256(config.get("token", "").encode()).hexdigest()[:16]
+    return f"{api_client.api_url}|{api_client.org or ''}|{caller}"
+
+
+def _read_projects_file(key: str) -> Tuple[float, List[Dict]]:
+    """Return (written_at, projects) from the on-disk cache if fresh and for the same instance, else (0, [])"""
+    try:
+        written_at = os.path.getmtime(PROJECTS_CACHE_FILE)
+        if time.time() - written_at >= PROJECTS_TTL_SECONDS:
+            return 0.0, []
+        with open(PROJECTS_CACHE_FILE, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return 0.0, []
+    if cached.get("key") != key:
+        return 0.0, []
+    return written_at, cached.get("projects", [])
+
+
+def _write_projects_file(key: str, projects: List[Dict]) -> None:
+    """Write the on-disk cache; failures only cost a refetch later"""
+    write_private_json(PROJECTS_CACHE_FILE, {"key": key, "projects": projects})
+
+
+def get_projects(api_client) -> List[Dict]:
+    """Get published projects, reusing a listing fetched within PROJECTS_TTL_SECONDS by any client or run"""
+    key = _cache_key(api_client)
+    now = time.time()
+    cached = _PROJECTS_CACHE.get(key)
+    if cached and now - cached[0] < PROJECTS_TTL_SECONDS:
+        return cached[1]
+
+    fetched_at, projects = _read_projects_file(key)
+    if not projects:
+        fetched_at = now
+        projects = api_client.get_published_projects()
+        if projects:
+            _write_projects_file(key, projects)
+
+    _PROJECTS_CACHE[key] = (fetched_at, projects)
+    return projects
+
+
+def make_cube_data(project_id: str, project_name: str, cube_id: str, cube_name: str) -> Dict:
+    """Build the cube_data dict used by the report and rebuild flows"""
+    return {
+        "display": f"{project_name}::{cube_name}",
+        "project_name": project_name,
+        "project_id": project_id,
+        "cube_name": cube_name,
+        "cube_id": cube_id
+    }
+
+
+def iter_cube_options(projects: List[Dict]) -> Iterator[Dict]:
+    """Yield a cube_data dict for every cube of every project, in listing order"""
+    for project in projects:
+        project_name = project.get("name", "Unknown Project")
+        project_id = project.get("id", "")
+        for cube in project.get("cubes", []):
+            yield make_cube_data(
+                project_id, project_name, cube.get("id", ""), cube.get("name", "Unknown Cube")
+            )
+
+
+def _build_cube_index(projects: List[Dict]) -> Dict[Tuple[str, str], Dict]:
+    """Map (project_id, cube_id) to its cube_data dict"""
+    return {(cube_data["project_id"], cube_data["cube_id"]): cube_data for cube_data in iter_cube_options(projects)}
+
+
+def get_cube_index(api_client) -> Dict[Tuple[str, str], Dict]:
+    """Get the (project_id, cube_id) -> cube_data index, rebuilt only when the projects listing changes"""
+    projects = get_projects(api_client)
+    key = _cache_key(api_client)
+    fetched_at = _PROJECTS_CACHE[key][0]
+    cached = _CUBE_INDEX_CACHE.get(key)
+    if cached and cached[0] == fetched_at:
+        return cached[1]
+
+    index = _build_cube_index(projects)
+    _CUBE_INDEX_CACHE[key] = (fetched_at, index)
+    return index
+
+
+def clear_projects_cache() -> None:
+    """Drop cached project listings from memory and disk"""
+    _PROJECTS_CACHE.clear()
+    _CUBE_INDEX_CACHE.clear()
+    try:
+        os.remove(PROJECTS_CACHE_FILE)
+    except OSError:
+        pass
@@ -1,18 +1,19 @@
 # rebuild_manager.py - UPDATED TO USE API CLIENT
 from typing import List, Dict, Optional
 from api_client import AtScaleAPIClient
+from projects_util import get_projects, iter_cube_options
 from ui_components import SimpleListSelector, confirm_action
 
 
 class RebuildManager:
-    def __init__(self):
-        # USE API CLIENT INSTEAD OF DIRECT REQUESTS
-        self.api_client = AtScaleAPIClient()
+    def __init__(self, api_client: Optional[AtScaleAPIClient] = None):
+        # USE API CLIENT INSTEAD OF DIRECT REQUESTS (shared with other managers when passed in)
+        self.api_client = api_client or AtScaleAPIClient()
     
     def get_published_projects(self) -> List[Dict]:
         """Get list of published projects with cubes - USE API CLIENT"""
         # DELEGATE TO THE CORRECT API CLIENT METHOD
-        return self.api_client.get_published_projects()
+        return get_projects(self.api_client)
 
     def rebuild_cube(self) -> None:
         """Interactive flow to select and rebuild a cube"""
@@ -25,25 +26,7 @@ class RebuildManager:
                 return
             
             # Create list of project::cube options
-            cube_options = []
-            
-            for project in projects:
-                project_name = project.get("name", "Unknown Project")
-                project_id = project.get("id", "")
-                
-                cubes = project.get("cubes", [])
-                for cube in cubes:
-                    cube_name = cube.get("name", "Unknown Cube")
-                    cube_id = cube.get("id", "")
-                    
-                    display_name = f"{project_name}::{cube_name}"
-                    cube_options.append({
-                        "display": display_name,
-                        "project_name": project_name,
-                        "project_id": project_id,
-                        "cube_name": cube_name,
-                        "cube_id": cube_id
-                    })
+            cube_options = list(iter_cube_options(projects))
             
             if not cube_options:
                 print("No cubes found in published projects.")
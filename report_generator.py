@@ -1,53 +1,51 @@
 # report_generator.py
-from typing import Dict, List
+from functools import cached_property
+from typing import Dict, List, Optional
 from api_client import AtScaleAPIClient
+from projects_util import get_projects, iter_cube_options
 from ui_components import SimpleListSelector, confirm_action
-from cube_aggregate_reporter import CubeAggregateReporter
-from aggregate_statistics import AggregateStatistics
-from aggregate_health_checker import AggregateHealthChecker
-from aggregate_build_history import AggregateBuildHistory
 
 
 class ReportGenerator:
-    def __init__(self):
-        self.api_client = AtScaleAPIClient()
-        self.aggregate_reporter = CubeAggregateReporter(self.api_client)
-        self.aggregate_stats = AggregateStatistics(self.api_client)
-        self.aggregate_health = AggregateHealthChecker(self.api_client)
-        self.build_history = AggregateBuildHistory(self.api_client)
+    def __init__(self, api_client: Optional[AtScaleAPIClient] = None):
+        # Pass a shared client to reuse its pooled connections across managers
+        self.api_client = api_client or AtScaleAPIClient()
+
+    # Report modules are imported and built on first use, so a run only loads the reports it shows
+
+    @cached_property
+    def aggregate_reporter(self):
+        from cube_aggregate_reporter import CubeAggregateReporter
+        return CubeAggregateReporter(self.api_client)
+
+    @cached_property
+    def aggregate_stats(self):
+        from aggregate_statistics import AggregateStatistics
+        return AggregateStatistics(self.api_client)
+
+    @cached_property
+    def aggregate_health(self):
+        from aggregate_health_checker import AggregateHealthChecker
+        return AggregateHealthChecker(self.api_client)
+
+    @cached_property
+    def build_history(self):
+        from aggregate_build_history import AggregateBuildHistory
+        return AggregateBuildHistory(self.api_client)
 
     def generate_report(self) -> None:
         """Generate aggregate report with cube selection first"""
         try:
             print("\nLoading published projects and cubes...")
             # USE THE CORRECT API CLIENT METHOD
-            projects = self.api_client.get_published_projects()
+            projects = get_projects(self.api_client)
             
             if not projects:
                 print("No published projects found.")
                 return
             
             # Create list of project::cube options
-            cube_options = []
-            
-            for project in projects:
-                project_name = project.get("name", "Unknown Project")
-                project_id = project.get("id", "")
-                
-                cubes = project.get("cubes", [])
-                for cube in cubes:
-                    cube_name = cube.get("name", "Unknown Cube")
-                    cube_id = cube.get("id", "")
-                    
-                    # Format: Project::Cube
-                    display_name = f"{project_name}::{cube_name}"
-                    cube_options.append({
-                        "display": display_name,
-                        "project_name": project_name,
-                        "project_id": project_id,
-                        "cube_name": cube_name,
-                        "cube_id": cube_id
-                    })
+            cube_options = list(iter_cube_options(projects))
             
             if not cube_options:
                 print("No cubes found in published projects.")
@@ -96,9 +94,15 @@ class ReportGenerator:
                 return
             
             if selected == "List aggregates with details":
-                self.aggregate_reporter.list_cube_aggregates(cube_data)
+                try:
+                    self.aggregate_reporter.list_cube_aggregates(cube_data)
+                except Exception as e:
+                    print(f"Error: {e}")
             elif selected == "Export aggregates to CSV":
-                self.aggregate_reporter.export_cube_aggregates_csv(cube_data)
+                try:
+                    self.aggregate_reporter.export_cube_aggregates_csv(cube_data)
+                except Exception as e:
+                    print(f"Error exporting to CSV: {e}")
             elif selected == "Show aggregate statistics":
                 self.aggregate_stats.show_cube_aggregate_statistics(cube_data)
             elif selected == "Check aggregate health":
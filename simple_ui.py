@@ -1,6 +1,6 @@
 # simple_ui.py - Alternative with simpler navigation
-import os
 from typing import List, Dict, Any, Optional
+from ui_components import clear_screen
 
 
 class SimpleListMenu:
@@ -13,7 +13,7 @@ class SimpleListMenu:
     
     def select(self) -> Optional[Any]:
         """Display items and let user select by number"""
-        os.system("cls" if os.name == "nt" else "clear")
+        clear_screen()
         
         if self.title:
             print(f"\n{self.title}")
@@ -64,7 +64,7 @@ class SimpleListMenu:
 
 def display_menu(options: List[str], title: str = "") -> Optional[int]:
     """Display a simple menu and return selected index"""
-    os.system("cls" if os.name == "nt" else "clear")
+    clear_screen()
     
     if title:
         print(f"\n{title}")
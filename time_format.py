@@ -0,0 +1,23 @@
+# time_format.py
+from functools import lru_cache
+
+# (lower bound in ms, divisor, suffix), checked largest first; anything smaller prints as whole ms
+_TIME_SCALES = (
+    (60000, 60000, "min"),
+    (1000, 1000, "s"),
+)
+
+
+def format_ms(milliseconds: float) -> str:
+    """Format time in milliseconds to human readable format"""
+    # Round to whole milliseconds so repeated durations share a cache entry
+    return _format_whole_ms(round(milliseconds))
+
+
+@lru_cache(maxsize=1024)
+def _format_whole_ms(milliseconds: int) -> str:
+    """Format a whole number of milliseconds (memoized)"""
+    for threshold, divisor, suffix in _TIME_SCALES:
+        if milliseconds >= threshold:
+            return f"{milliseconds / divisor:.1f}{suffix}"
+    return f"{milliseconds}ms"
@@ -1,18 +1,47 @@
 # ui_components.py
 import os
-from typing import List, Dict, Any, Optional
+import sys
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Optional, Sequence, Union
+
+try:
+    import readline  # line editing and up-arrow recall for input(); not available on Windows
+except ImportError:
+    readline = None
+
+# Entries kept in the input() history shared by all prompts
+HISTORY_LENGTH = 100
+
+# Clear the screen and home the cursor (one write instead of spawning cls/clear)
+_CLEAR_SCREEN = "\x1b[2J\x1b[H"
+
+# Windows consoles only honour ANSI escapes once VT processing is enabled; an empty system() call turns it on
+if os.name == "nt":
+    os.system("")
+
+
+def clear_screen() -> None:
+    """Clear the terminal"""
+    sys.stdout.write(_CLEAR_SCREEN)
+    sys.stdout.flush()
 
 
 class SimpleListSelector:
     """A simple list selector that works reliably across platforms"""
     
-    def __init__(self, items: List[Any], title: str = ""):
-        self.items = items
+    # title -> last selected number, offered as the default the next time that list is shown
+    _last_choices: Dict[str, int] = {}
+    
+    def __init__(self, items: Iterable[Any], title: str = ""):
+        # Materialized once so generators can be passed in directly
+        self.items = list(items)
         self.title = title
+        # Formatted once; redraws reuse the same text
+        self._display_text = "\n".join(self._format_item(item, i) for i, item in enumerate(self.items, 1))
     
     def select(self) -> Optional[Any]:
         """Display items and let user select by number"""
-        os.system("cls" if os.name == "nt" else "clear")
+        clear_screen()
         
         if self.title:
             print(f"\n{self.title}")
@@ -23,21 +52,29 @@ class SimpleListSelector:
             return None
         
         # Display items
-        for i, item in enumerate(self.items, 1):
-            display_text = self._format_item(item, i)
-            print(f"{display_text}")
+        print(self._display_text)
         
         print(f"\n{'─'*50}")
         
+        if readline is not None:
+            readline.set_history_length(HISTORY_LENGTH)
+        last_choice = self._last_choices.get(self.title)
+        if last_choice is not None and last_choice > len(self.items):
+            last_choice = None
+        default = f" [{last_choice}]" if last_choice is not None else ""
+        prompt = f"Select item (1-{len(self.items)}, or 'q' to quit){default}: "
+        
         while True:
             try:
-                choice = input(f"Select item (1-{len(self.items)}, or 'q' to quit): ").strip().lower()
+                choice = input(prompt).strip().lower()
                 
                 if choice == 'q':
                     return None
                 
-                index = int(choice) - 1
+                # Enter alone repeats the previous selection from this list
+                index = (int(choice) if choice or last_choice is None else last_choice) - 1
                 if 0 <= index < len(self.items):
+                    self._last_choices[self.title] = index + 1
                     return self.items[index]
                 else:
                     print(f"Please enter a number between 1 and {len(self.items)}")
@@ -61,34 +98,43 @@ class SimpleListSelector:
         return f"{index:2d}. {str(item)}"
 
 
-def display_table(data: List[Dict], columns: List[str]) -> None:
-    """Display data in a formatted table"""
-    if not data:
+def display_table(data: Iterable[Union[Dict, Sequence]], columns: List[str],
+                  page_size: Optional[int] = None) -> None:
+    """Display data in a formatted table
+
+    Rows may be dicts keyed by column name or tuples already in column order.
+    With page_size set, data may be a generator: rows are pulled and printed
+    one page at a time, each page with its own header and column widths.
+    """
+    data_iter = iter(data)
+    page = list(islice(data_iter, page_size)) if page_size else list(data_iter)
+    if not page:
         print("No data to display")
         return
 
-    # Calculate column widths
-    col_widths = {}
-    for col in columns:
-        max_len = len(col)
-        for row in data:
-            if col in row:
-                max_len = max(max_len, len(str(row[col])))
-        col_widths[col] = max_len + 2  # Add padding
-
-    # Print header
-    header = " | ".join([col.ljust(col_widths[col]) for col in columns])
-    separator = "-+-".join(["-" * col_widths[col] for col in columns])
-    print("\n" + header)
-    print(separator)
-
-    # Print rows
-    for row in data:
-        row_str = " | ".join(
-            [str(row.get(col, "")).ljust(col_widths[col]) for col in columns]
-        )
-        print(row_str)
-    print()
+    while page:
+        _print_table_page(page, columns)
+        page = list(islice(data_iter, page_size)) if page_size else []
+
+
+def _print_table_page(data: List[Union[Dict, Sequence]], columns: List[str]) -> None:
+    """Print one block of rows with a header sized to that block"""
+    # Stringify every cell once; widths and output both use these
+    cells = [
+        [str(value) for value in row] if not isinstance(row, dict) else [str(row.get(col, "")) for col in columns]
+        for row in data
+    ]
+
+    # Calculate column widths (zip transposes rows to columns, header included)
+    col_widths = [max(map(len, column)) + 2 for column in zip(columns, *cells)]  # Add padding
+    # Compiled once per page; every row goes through the same C-level format call
+    format_row = " | ".join(f"{{:<{width}}}" for width in col_widths).format
+
+    # Header, separator and rows written as one block
+    separator = "-+-".join(["-" * width for width in col_widths])
+    out = ["", format_row(*columns), separator]
+    out.extend(format_row(*row) for row in cells)
+    sys.stdout.write("\n".join(out) + "\n\n")
 
 
 def confirm_action(prompt: str) -> bool: